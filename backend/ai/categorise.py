@@ -1,6 +1,8 @@
 import os
 import json
-from typing import List, Dict, Optional
+import asyncio
+import orjson
+from typing import List, Dict, Optional, Iterable
 from dotenv import load_dotenv
 
 # Load environment variables
@@ -8,14 +10,61 @@ load_dotenv(dotenv_path='.env')
 
 # Try to import OpenAI (user needs to install openai package)
 try:
-    from openai import OpenAI
+    import httpx
+    from openai import OpenAI, AsyncOpenAI
     OPENAI_AVAILABLE = True
 except ImportError:
     OPENAI_AVAILABLE = False
 
+# Cap on combined input characters packed into one batched labeling request (~6k tokens)
+MAX_BATCH_CHARS = 24000
+
+# Keep-alive HTTP/2 connection pool shared by every AsyncOpenAI client created here
+_shared_http_client = None
+
+
+def _new_http_client() -> "httpx.AsyncClient":
+    """Keep-alive HTTP/2 client for AsyncOpenAI (its connections belong to the event loop that uses them)"""
+    return httpx.AsyncClient(
+        http2=True,
+        limits=httpx.Limits(max_keepalive_connections=20, max_connections=40),
+        timeout=httpx.Timeout(60.0, connect=10.0),
+    )
+
+
+def get_shared_http_client() -> "httpx.AsyncClient":
+    """Return the module-level keep-alive HTTP/2 client, creating it on first use"""
+    global _shared_http_client
+    if _shared_http_client is None or _shared_http_client.is_closed:
+        _shared_http_client = _new_http_client()
+    return _shared_http_client
+
+
+async def close_shared_http_client():
+    """Close the shared keep-alive client, if one was created"""
+    global _shared_http_client
+    if _shared_http_client is not None:
+        await _shared_http_client.aclose()
+        _shared_http_client = None
+
+
+def create_async_openai(api_key: Optional[str] = None) -> "AsyncOpenAI":
+    """
+    Create an AsyncOpenAI client that reuses the shared keep-alive connection pool
+    
+    Args:
+        api_key: OpenAI API key (or use OPENAI_API_KEY from .env)
+        
+    Returns:
+        AsyncOpenAI client
+    """
+    return AsyncOpenAI(api_key=api_key or os.getenv('OPENAI_API_KEY'),
+                       http_client=get_shared_http_client())
+
 
 class TextLabeler:
-    def __init__(self, api_key: Optional[str] = None, model: str = "gpt-4o-mini", debug: bool = False):
+    def __init__(self, api_key: Optional[str] = None, model: str = "gpt-4o-mini", debug: bool = False,
+                 aclient: Optional["AsyncOpenAI"] = None):
         """
         Initialize text labeler with LLM
         
@@ -23,6 +72,7 @@ class TextLabeler:
             api_key: OpenAI API key (or use OPENAI_API_KEY from .env)
             model: Model to use (default: gpt-4o-mini for cost efficiency)
             debug: Print debug information
+            aclient: Shared AsyncOpenAI client (default: one on the shared keep-alive pool)
         """
         self.debug = debug
         self.model = model
@@ -42,20 +92,13 @@ class TextLabeler:
             )
         
         self.client = OpenAI(api_key=api_key)
+        self.aclient = aclient or create_async_openai(api_key)
         
         if debug:
             print(f"✓ TextLabeler initialized with model: {model}")
     
-    def label_text(self, text: str) -> Dict[str, str]:
-        """
-        Label a single text with category and summary
-        
-        Args:
-            text: Text to label
-            
-        Returns:
-            Dictionary with 'summary', 'category', and 'text' fields
-        """
+    def _build_messages(self, text: str) -> List[Dict[str, str]]:
+        """Build the chat messages asking the LLM to label a single text"""
         prompt = f"""Analyze the following text and provide:
 1. A single sentence summary
 2. A category: one of "industry", "company", or "world"
@@ -72,81 +115,241 @@ Respond in JSON format with exactly these fields:
     "category": "industry" or "company" or "world"
 }}
 """
+        return [
+            {
+                "role": "system",
+                "content": "You are a text categorization assistant. Always respond with valid JSON only."
+            },
+            {
+                "role": "user",
+                "content": prompt
+            }
+        ]
+    
+    def _parse_label(self, text: str, content: str) -> Dict[str, str]:
+        """Turn the LLM's JSON reply into a labeled text dictionary"""
+        result = json.loads(content)
+        
+        # Ensure all required fields are present
+        labeled = {
+            'summary': result.get('summary', ''),
+            'category': result.get('category', 'world'),
+            'text': text
+        }
+        
+        if self.debug:
+            print(f"  ✓ Labeled: {labeled['category']} - {labeled['summary'][:50]}...")
+        
+        return labeled
+    
+    @staticmethod
+    def _default_label(text: str) -> Dict[str, str]:
+        """Default structure returned when labeling fails"""
+        return {
+            'summary': 'Unable to generate summary',
+            'category': 'world',
+            'text': text
+        }
+    
+    def _build_batch_messages(self, texts: List[str]) -> List[Dict[str, str]]:
+        """Build the chat messages asking the LLM to label several numbered texts at once"""
+        numbered = "".join(f"[{i}] {text}\n" for i, text in enumerate(texts))
+        prompt = f"""Analyze each of the following numbered texts and provide for each:
+1. A single sentence summary
+2. A category: one of "industry", "company", or "world"
+   - "industry": Technical/industry insights, trends, or professional content
+   - "company": Content about the founder's own company, products, or services
+   - "world": Non-technical views, personal opinions, or general world topics
+
+Texts to analyze:
+{numbered}
+Respond in JSON format with one entry per numbered input, in order:
+{{
+    "results": [
+        {{"index": 0, "summary": "single sentence summary here", "category": "industry" or "company" or "world"}},
+        ...
+    ]
+}}
+"""
+        return [
+            {
+                "role": "system",
+                "content": "You are a text categorization assistant. Always respond with valid JSON only."
+            },
+            {
+                "role": "user",
+                "content": prompt
+            }
+        ]
+    
+    @staticmethod
+    def _make_batches(texts: Iterable[str], batch_size: int) -> List[List[str]]:
+        """Split texts (consumed lazily) into batches of at most batch_size items and MAX_BATCH_CHARS characters"""
+        batches = []
+        current = []
+        current_chars = 0
+        for text in texts:
+            if current and (len(current) >= batch_size or current_chars + len(text) > MAX_BATCH_CHARS):
+                batches.append(current)
+                current = []
+                current_chars = 0
+            current.append(text)
+            current_chars += len(text)
+        if current:
+            batches.append(current)
+        return batches
+    
+    def label_text(self, text: str) -> Dict[str, str]:
+        """
+        Label a single text with category and summary
         
+        Args:
+            text: Text to label
+            
+        Returns:
+            Dictionary with 'summary', 'category', and 'text' fields
+        """
         try:
             if self.debug:
                 print(f"  Labeling text: {text[:50]}...")
             
             response = self.client.chat.completions.create(
                 model=self.model,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are a text categorization assistant. Always respond with valid JSON only."
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
+                messages=self._build_messages(text),
                 temperature=0.3,
                 response_format={"type": "json_object"}
             )
             
-            result = json.loads(response.choices[0].message.content)
-            
-            # Ensure all required fields are present
-            labeled = {
-                'summary': result.get('summary', ''),
-                'category': result.get('category', 'world'),
-                'text': text
-            }
-            
-            if self.debug:
-                print(f"  ✓ Labeled: {labeled['category']} - {labeled['summary'][:50]}...")
-            
-            return labeled
+            return self._parse_label(text, response.choices[0].message.content)
             
         except Exception as e:
             if self.debug:
                 print(f"  ✗ Error labeling text: {e}")
             # Return default structure on error
-            return {
-                'summary': 'Unable to generate summary',
-                'category': 'world',
-                'text': text
-            }
+            return self._default_label(text)
+    
+    async def _label_one(self, text: str, sem: asyncio.Semaphore, aclient: "AsyncOpenAI") -> Dict[str, str]:
+        """Label a single text with the async client, bounded by the semaphore"""
+        async with sem:
+            try:
+                if self.debug:
+                    print(f"  Labeling text: {text[:50]}...")
+                
+                response = await aclient.chat.completions.create(
+                    model=self.model,
+                    messages=self._build_messages(text),
+                    temperature=0.3,
+                    response_format={"type": "json_object"}
+                )
+                
+                return self._parse_label(text, response.choices[0].message.content)
+                
+            except Exception as e:
+                if self.debug:
+                    print(f"  ✗ Error labeling text: {e}")
+                return self._default_label(text)
+    
+    async def _label_batch(self, batch: List[str], sem: asyncio.Semaphore,
+                           aclient: "AsyncOpenAI") -> List[Dict[str, str]]:
+        """Label a batch of texts with one request; falls back to per-text labeling for any misses"""
+        labeled: List[Optional[Dict[str, str]]] = [None] * len(batch)
+        
+        async with sem:
+            try:
+                response = await aclient.chat.completions.create(
+                    model=self.model,
+                    messages=self._build_batch_messages(batch),
+                    temperature=0.3,
+                    response_format={"type": "json_object"}
+                )
+                
+                entries = json.loads(response.choices[0].message.content).get('results', [])
+                for position, entry in enumerate(entries):
+                    i = entry.get('index', position) if isinstance(entry, dict) else None
+                    if isinstance(i, int) and 0 <= i < len(batch) and labeled[i] is None:
+                        labeled[i] = {
+                            'summary': entry.get('summary', ''),
+                            'category': entry.get('category', 'world'),
+                            'text': batch[i]
+                        }
+                
+            except Exception as e:
+                if self.debug:
+                    print(f"  ✗ Error labeling batch of {len(batch)} texts: {e}")
+        
+        # Re-label any outliers individually (outside the semaphore to avoid self-deadlock)
+        missing = [i for i, item in enumerate(labeled) if item is None]
+        if missing:
+            if self.debug:
+                print(f"  Falling back to per-text labeling for {len(missing)} text(s)")
+            retried = await asyncio.gather(*[self._label_one(batch[i], sem, aclient) for i in missing])
+            for i, item in zip(missing, retried):
+                labeled[i] = item
+        
+        return labeled
     
-    def label_texts(self, texts: List[str], batch_size: int = 10) -> List[Dict[str, str]]:
+    async def label_texts_async(self, texts: Iterable[str], batch_size: int = 10,
+                                max_concurrency: int = 20,
+                                aclient: Optional["AsyncOpenAI"] = None) -> List[Dict[str, str]]:
         """
-        Label multiple texts
+        Label multiple texts, packing several texts into each request and
+        sending the requests concurrently
         
         Args:
-            texts: List of texts to label
-            batch_size: Process in batches (to avoid rate limits)
+            texts: Texts to label (any iterable)
+            batch_size: Maximum number of texts per request
+            max_concurrency: Maximum number of in-flight requests (to respect rate limits)
+            aclient: AsyncOpenAI client to send the requests with (default: self.aclient)
             
         Returns:
-            List of labeled text dictionaries
+            List of labeled text dictionaries, in the same order as texts
         """
-        labeled_texts = []
+        aclient = aclient or self.aclient
+        batches = self._make_batches(texts, batch_size)
         
         if self.debug:
-            print(f"Labeling {len(texts)} texts...")
+            print(f"Labeling {sum(len(batch) for batch in batches)} texts in {len(batches)} batches "
+                  f"(up to {max_concurrency} concurrent requests)...")
         
-        for i in range(0, len(texts), batch_size):
-            batch = texts[i:i + batch_size]
-            if self.debug:
-                print(f"  Processing batch {i // batch_size + 1}/{(len(texts) + batch_size - 1) // batch_size}")
-            
-            for text in batch:
-                labeled = self.label_text(text)
-                labeled_texts.append(labeled)
+        sem = asyncio.Semaphore(max_concurrency)
+        results = await asyncio.gather(
+            *[self._label_batch(batch, sem, aclient) for batch in batches],
+            return_exceptions=True
+        )
+        
+        labeled_texts = []
+        for batch, result in zip(batches, results):
+            if isinstance(result, BaseException):
+                labeled_texts.extend(self._default_label(text) for text in batch)
+            else:
+                labeled_texts.extend(result)
         
         if self.debug:
             print(f"✓ Labeled {len(labeled_texts)} texts")
         
         return labeled_texts
     
+    def label_texts(self, texts: Iterable[str], batch_size: int = 10) -> List[Dict[str, str]]:
+        """
+        Label multiple texts (sync wrapper around label_texts_async)
+        
+        Each call runs its own event loop, so it uses its own connection pool for that loop
+        rather than the shared one (whose connections stay bound to the loop that opened them)
+        
+        Args:
+            texts: Texts to label (any iterable)
+            batch_size: Maximum number of texts per request
+            
+        Returns:
+            List of labeled text dictionaries
+        """
+        async def run():
+            async with _new_http_client() as http_client:
+                aclient = AsyncOpenAI(api_key=self.client.api_key, http_client=http_client)
+                return await self.label_texts_async(texts, batch_size=batch_size, aclient=aclient)
+        
+        return asyncio.run(run())
+    
     def save_labeled_texts(self, labeled_texts: List[Dict[str, str]], output_file: str, format: str = 'json'):
         """
         Save labeled texts to a file
@@ -165,10 +368,9 @@ Respond in JSON format with exactly these fields:
             os.makedirs(os.path.dirname(output_file), exist_ok=True) if os.path.dirname(output_file) else None
             
             if format == 'json':
-                # Save as JSON lines (one JSON object per line)
-                with open(output_file, 'w', encoding='utf-8') as f:
-                    for labeled in labeled_texts:
-                        f.write(json.dumps(labeled, ensure_ascii=False) + '\n')
+                # Save as JSON lines (one JSON object per line), joined into a single buffered write
+                with open(output_file, 'wb') as f:
+                    f.write(b'\n'.join(orjson.dumps(labeled) for labeled in labeled_texts) + b'\n')
                 
                 if self.debug:
                     print(f"  ✓ Saved {len(labeled_texts)} labeled texts to {output_file} (JSON lines)")
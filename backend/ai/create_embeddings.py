@@ -1,8 +1,19 @@
+import io
 import os
-import json
+import asyncio
+import base64
+import fcntl
+import hashlib
+import sqlite3
+import threading
+import orjson
+from collections import OrderedDict, namedtuple
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
 import faiss
+import httpx
 import numpy as np
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Iterable, Tuple
 from dotenv import load_dotenv
 
 # Load environment variables
@@ -15,9 +26,62 @@ try:
 except ImportError:
     OPENAI_AVAILABLE = False
 
+# Metadata is stored as msgpack next to the JSON path when available (smaller, faster to parse)
+try:
+    import msgpack
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    MSGPACK_AVAILABLE = False
+
+# Large labeled JSONL files are parsed with pyarrow's multi-threaded C++ reader when available
+try:
+    import pyarrow as pa
+    import pyarrow.json as paj
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+# With index_type="auto", exact IndexFlatIP search is kept until the store holds this many
+# vectors, then the index is rebuilt as IndexHNSWFlat
+HNSW_MIN_VECTORS = 10000
+
+# With index_type="ivfpq", the store stays flat until it holds this many vectors per IVF list,
+# enough to train the coarse quantizer and PQ codebooks
+IVF_TRAIN_POINTS_PER_LIST = 30
+
+# Texts per embeddings request (API limit is 2048 inputs) and concurrent requests
+EMBEDDING_BATCH_SIZE = 256
+EMBEDDING_MAX_WORKERS = 8
+
+# On-disk embedding cache (SQLite, keyed by sha256 of model + text); pass cache_path=None to disable
+DEFAULT_CACHE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                  "data", "embedding_cache.sqlite")
+# In-memory LRU of recent query embeddings used by search()
+QUERY_CACHE_SIZE = 256
+
+
+class Result(namedtuple('Result', 'summary category text distance rank')):
+    """
+    A single search hit
+    
+    Fields share the stored metadata strings instead of copying them. Fields can also be read
+    by key (result['distance']) like the dicts search() used to return; use _asdict() for JSON.
+    """
+    __slots__ = ()
+    
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            return getattr(self, key)
+        return super().__getitem__(key)
+
 
 class EmbeddingStore:
-    def __init__(self, embedding_model: str = "text-embedding-3-small", dimension: int = 1536, debug: bool = False):
+    def __init__(self, embedding_model: str = "text-embedding-3-small", dimension: int = 1536, debug: bool = False,
+                 index_type: str = "auto", hnsw_m: int = 32, ef_construction: int = 40, ef_search: int = 16,
+                 nlist: int = 4096, pq_m: int = 64, nprobe: int = 16, pq_fast_scan: bool = False,
+                 rerank_k_factor: int = 0,
+                 cache_path: Optional[str] = DEFAULT_CACHE_PATH, mmap_index: bool = True,
+                 use_gpu: bool = False, save_vectors: bool = False):
         """
         Initialize embedding store with FAISS
         
@@ -25,10 +89,54 @@ class EmbeddingStore:
             embedding_model: OpenAI embedding model to use
             dimension: Dimension of embeddings (1536 for text-embedding-3-small, 3072 for text-embedding-3-large)
             debug: Print debug information
+            index_type: 'flat' (exact), 'hnsw' (approximate graph search), 'sq8' (int8
+                        scalar-quantized vectors), 'ivfpq' (inverted lists with PQ-compressed
+                        vectors, built once there is enough data to train) or 'auto' (flat until
+                        HNSW_MIN_VECTORS vectors, then HNSW); all score by inner product on
+                        L2-normalized embeddings
+            hnsw_m: Neighbors per node in the HNSW graph
+            ef_construction: HNSW search depth while adding vectors
+            ef_search: HNSW search depth at query time
+            nlist: Number of IVF lists (coarse clusters) for 'ivfpq'
+            pq_m: Number of PQ sub-quantizers for 'ivfpq' (must divide dimension)
+            nprobe: IVF lists scanned per query for 'ivfpq'
+            pq_fast_scan: Use IndexIVFPQFastScan (4-bit codes, SIMD lookup tables) for 'ivfpq'
+            rerank_k_factor: For 'ivfpq', fetch k * rerank_k_factor PQ candidates and rerank them
+                             against exact float32 vectors (IndexRefineFlat); 0 disables
+            cache_path: SQLite file caching embeddings across runs (None disables it)
+            mmap_index: Memory-map index files on load instead of reading them into RAM
+                        (copied into memory on the first add)
+            use_gpu: Run the index on all visible GPUs (needs faiss-gpu; falls back to CPU
+                     for index types FAISS can't move, e.g. HNSW)
+            save_vectors: Also write the index's float32 vectors (as reconstructed by FAISS: decoded
+                          approximations for sq8, unnormalized for legacy L2 indexes) to a '.vecs'
+                          file next to the index on save (see vectors_path), memory-mapped as
+                          self.vectors. Off by default: it rewrites N x D floats on every save
         """
+        if index_type not in ("flat", "hnsw", "sq8", "ivfpq", "auto"):
+            raise ValueError(f"Unknown index_type: {index_type}. Use 'flat', 'hnsw', 'sq8', 'ivfpq' or 'auto'")
+        
         self.debug = debug
         self.embedding_model = embedding_model
         self.dimension = dimension
+        self.index_type = index_type
+        self.hnsw_m = hnsw_m
+        self.ef_construction = ef_construction
+        self.ef_search = ef_search
+        self.nlist = nlist
+        self.pq_m = pq_m
+        self.nprobe = nprobe
+        self.pq_fast_scan = pq_fast_scan
+        self.rerank_k_factor = rerank_k_factor
+        self.mmap_index = mmap_index
+        # True while self.index is a read-only memory map of an index file
+        self._index_mmapped = False
+        self.use_gpu = use_gpu and hasattr(faiss, 'StandardGpuResources') and faiss.get_num_gpus() > 0
+        # True while self.index lives on the GPU(s); saved via a CPU copy
+        self._index_on_gpu = False
+        self.save_vectors = save_vectors
+        # (dimension, n_vectors) memory map of the '.vecs' file as last loaded/saved, or None
+        self.vectors = None
         
         # Initialize OpenAI client
         if not OPENAI_AVAILABLE:
@@ -42,50 +150,309 @@ class EmbeddingStore:
                 "OpenAI API key required. Set OPENAI_API_KEY in .env file"
             )
         
-        self.client = OpenAI(api_key=api_key)
+        # Keep-alive HTTP/2 pool shared by all embedding requests (incl. concurrent batches)
+        self.client = OpenAI(
+            api_key=api_key,
+            http_client=httpx.Client(
+                http2=True,
+                timeout=httpx.Timeout(60.0, connect=10.0),
+                limits=httpx.Limits(max_keepalive_connections=EMBEDDING_MAX_WORKERS * 2,
+                                    max_connections=EMBEDDING_MAX_WORKERS * 4),
+            )
+        )
         
-        # Initialize FAISS index (L2 distance)
-        self.index = faiss.IndexFlatL2(dimension)
+        # Initialize FAISS index (inner product == cosine on normalized vectors)
+        self._set_index(self._new_index("flat" if index_type in ("auto", "ivfpq") else index_type))
         
-        # Store metadata (summary, category, text) for each embedding
+        # Store metadata (summary, category, text) for each embedding; after load() it is
+        # parsed on first access (see the metadata property)
+        self._metadata_load_lock = threading.Lock()
         self.metadata = []
         
+        # Guards index/metadata when the store is shared across requests
+        self._lock = threading.Lock()
+        # mtime of the index file this store last loaded or saved (None = never synced)
+        self._synced_mtime = None
+        # (metadata file, its size, entries it holds) as last loaded/saved, for append-only saves
+        self._metadata_synced = None
+        
+        # Embedding caches: persistent per-text vectors and recent query vectors
+        self._cache = self._open_cache(cache_path) if cache_path else None
+        self._cache_lock = threading.Lock()
+        self._query_cache = OrderedDict()
+        self._query_cache_lock = threading.Lock()
+        
         if debug:
             print(f"✓ EmbeddingStore initialized with model: {embedding_model}")
             print(f"  Dimension: {dimension}")
+            print(f"  Index type: {index_type}" + (" (GPU)" if self._index_on_gpu else ""))
+    
+    @property
+    def metadata(self) -> List[Dict]:
+        """Metadata entries, one per vector (parsed from the loaded file on first access)"""
+        if self._metadata_loader is not None:
+            with self._metadata_load_lock:
+                if self._metadata_loader is not None:
+                    self._metadata = self._metadata_loader()
+                    self._metadata_loader = None
+        return self._metadata
+    
+    @metadata.setter
+    def metadata(self, value: List[Dict]):
+        self._metadata = value
+        self._metadata_loader = None
+    
+    def _new_index(self, kind: str):
+        """Create an empty FAISS index ('flat', 'hnsw', 'sq8' or 'ivfpq') for the current dimension"""
+        if kind == "ivfpq":
+            # Untrained; _maybe_upgrade_index trains it on the vectors collected so far
+            quantizer = faiss.IndexFlatIP(self.dimension)
+            if self.pq_fast_scan:
+                index = faiss.IndexIVFPQFastScan(quantizer, self.dimension, self.nlist, self.pq_m, 4,
+                                                 faiss.METRIC_INNER_PRODUCT)
+            else:
+                index = faiss.IndexIVFPQ(quantizer, self.dimension, self.nlist, self.pq_m, 8,
+                                         faiss.METRIC_INNER_PRODUCT)
+            index.nprobe = self.nprobe
+            if self.rerank_k_factor > 0:
+                # Two-stage search: PQ codes shortlist candidates, exact vectors reorder them
+                index = faiss.IndexRefineFlat(index)
+                index.k_factor = self.rerank_k_factor
+            return index
+        if kind == "sq8":
+            # 1 byte per component instead of 4; needs training on the first batch added
+            return faiss.IndexScalarQuantizer(self.dimension, faiss.ScalarQuantizer.QT_8bit,
+                                              faiss.METRIC_INNER_PRODUCT)
+        if kind == "hnsw":
+            index = faiss.IndexHNSWFlat(self.dimension, self.hnsw_m, faiss.METRIC_INNER_PRODUCT)
+            index.hnsw.efConstruction = self.ef_construction
+            index.hnsw.efSearch = self.ef_search
+            return index
+        return faiss.IndexFlatIP(self.dimension)
+    
+    def _uses_inner_product(self) -> bool:
+        """Whether the current index scores by inner product (False for L2 indexes saved by older versions)"""
+        return self.index.metric_type == faiss.METRIC_INNER_PRODUCT
+    
+    def _set_index(self, index, mmapped: bool = False):
+        """Install a CPU index, moving it to the GPU(s) when enabled (call with lock held)"""
+        if self.use_gpu:
+            try:
+                self.index = faiss.index_cpu_to_all_gpus(index)
+                self._index_on_gpu = True
+                self._index_mmapped = False
+                return
+            except Exception as e:
+                if self.debug:
+                    print(f"  ⚠ Keeping index on CPU: {e}")
+        
+        self.index = index
+        self._index_on_gpu = False
+        self._index_mmapped = mmapped
+    
+    def _cpu_index(self):
+        """The current index as a CPU index (for writing to disk)"""
+        return faiss.index_gpu_to_cpu(self.index) if self._index_on_gpu else self.index
+    
+    def _materialize_index(self):
+        """Replace a read-only memory-mapped index with an in-memory copy (call with lock held)"""
+        if self._index_mmapped:
+            self.index = faiss.clone_index(self.index)
+            self._index_mmapped = False
+    
+    def _read_index(self, index_path: str):
+        """
+        Read a FAISS index, memory-mapped if enabled and supported
+        
+        Returns:
+            Tuple of (index, whether it is memory-mapped)
+        """
+        if self.mmap_index and hasattr(faiss, 'IO_FLAG_MMAP'):
+            try:
+                index = faiss.read_index(index_path, faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY)
+                
+                # Ask the kernel to start paging the file in before the first query
+                if hasattr(os, 'posix_fadvise'):
+                    fd = os.open(index_path, os.O_RDONLY)
+                    try:
+                        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+                    finally:
+                        os.close(fd)
+                
+                return index, True
+            except Exception as e:
+                if self.debug:
+                    print(f"  ⚠ Could not memory-map index, reading into memory: {e}")
+        
+        return faiss.read_index(index_path), False
+    
+    def _maybe_upgrade_index(self):
+        """
+        Rebuild a flat index as HNSW ('auto') or IVFPQ ('ivfpq') once it holds enough
+        vectors (call with lock held)
+        """
+        if self.index_type == "auto":
+            target, threshold = "hnsw", HNSW_MIN_VECTORS
+        elif self.index_type == "ivfpq":
+            target, threshold = "ivfpq", IVF_TRAIN_POINTS_PER_LIST * self.nlist
+        else:
+            return
+        
+        if not isinstance(self.index, (faiss.IndexFlatIP, faiss.IndexFlatL2)) or self.index.ntotal < threshold:
+            return
+        
+        # Vectors come back in insertion order, so metadata positions stay aligned
+        vectors = self.index.reconstruct_n(0, self.index.ntotal)
+        # Flat L2 indexes from older versions may hold unnormalized vectors
+        faiss.normalize_L2(vectors)
+        index = self._new_index(target)
+        if not index.is_trained:
+            index.train(vectors)
+        index.add(vectors)
+        self._set_index(index)
+        
+        if self.debug:
+            print(f"  ✓ Switched to {target.upper()} index at {index.ntotal} vectors")
+    
+    def _open_cache(self, cache_path: str) -> Optional[sqlite3.Connection]:
+        """Open (or create) the SQLite embedding cache; returns None if it can't be opened"""
+        try:
+            os.makedirs(os.path.dirname(cache_path), exist_ok=True) if os.path.dirname(cache_path) else None
+            conn = sqlite3.connect(cache_path, check_same_thread=False)
+            conn.execute("CREATE TABLE IF NOT EXISTS cache (key BLOB PRIMARY KEY, vec BLOB)")
+            conn.commit()
+            return conn
+        except Exception as e:
+            print(f"  ⚠ Embedding cache disabled: {e}")
+            return None
+    
+    def _cache_key(self, text: str) -> bytes:
+        return hashlib.sha256((self.embedding_model + "\0" + text).encode('utf-8')).digest()
+    
+    def _cache_get_many(self, keys: List[bytes]) -> Dict[bytes, bytes]:
+        """Fetch cached vectors for keys (missing keys are left out)"""
+        found = {}
+        with self._cache_lock:
+            # Stay under SQLite's bound-parameter limit
+            for i in range(0, len(keys), 500):
+                chunk = keys[i:i + 500]
+                rows = self._cache.execute(
+                    f"SELECT key, vec FROM cache WHERE key IN ({','.join('?' * len(chunk))})", chunk
+                ).fetchall()
+                found.update(rows)
+        return found
+    
+    def _cache_put_many(self, items: List[tuple]):
+        """Store (key, vector bytes) pairs"""
+        with self._cache_lock:
+            self._cache.executemany("INSERT OR REPLACE INTO cache (key, vec) VALUES (?, ?)", items)
+            self._cache.commit()
+    
+    def _embed_batch(self, texts: List[str], out: np.ndarray):
+        """Embed one batch of texts with a single OpenAI request, writing rows into out (float32)"""
+        # base64 returns the raw little-endian float32 bytes: smaller on the wire and
+        # decoded without building Python float lists
+        response = self.client.embeddings.create(
+            model=self.embedding_model,
+            input=texts,
+            encoding_format="base64"
+        )
+        
+        for row, item in enumerate(response.data):
+            if isinstance(item.embedding, str):
+                vector = np.frombuffer(base64.b64decode(item.embedding), dtype='<f4')
+            else:
+                vector = item.embedding
+            
+            # Verify dimension matches
+            if row == 0 and len(vector) != self.dimension:
+                raise ValueError(
+                    f"Embedding dimension mismatch: expected {self.dimension}, "
+                    f"got {len(vector)}. Update dimension parameter."
+                )
+            
+            np.copyto(out[row], vector, casting='unsafe')
     
     def create_embeddings(self, texts: List[str]) -> np.ndarray:
         """
         Create embeddings for a list of texts
         
+        Texts already in the on-disk cache are not sent to the API; new
+        embeddings are added to the cache.
+        
         Args:
             texts: List of texts to embed
             
         Returns:
-            Numpy array of embeddings
+            Numpy array of embeddings (float32, one row per text)
         """
         if not texts:
             return np.array([])
         
+        if self._cache is None:
+            return self._embed_uncached(texts)
+        
+        keys = [self._cache_key(text) for text in texts]
+        try:
+            cached = self._cache_get_many(list(set(keys)))
+        except Exception as e:
+            print(f"  ⚠ Embedding cache read failed: {e}")
+            cached = {}
+        # Entries that aren't a full float32 vector (INT8 blobs written by an earlier version)
+        # are treated as misses, re-embedded and overwritten
+        cached = {key: vec for key, vec in cached.items() if len(vec) == self.dimension * 4}
+        
+        # Embed each distinct uncached text once
+        miss_keys = []
+        miss_texts = []
+        for key, text in zip(keys, texts):
+            if key not in cached:
+                cached[key] = None
+                miss_keys.append(key)
+                miss_texts.append(text)
+        
+        if self.debug:
+            print(f"  Embedding cache: {len(texts) - len(miss_texts)} hits, {len(miss_texts)} to embed")
+        
+        if miss_texts:
+            new_embeddings = self._embed_uncached(miss_texts)
+            new_items = [(key, vec.tobytes()) for key, vec in zip(miss_keys, new_embeddings)]
+            try:
+                self._cache_put_many(new_items)
+            except Exception as e:
+                print(f"  ⚠ Embedding cache write failed: {e}")
+            
+            # Nothing cached and no duplicates: rows already line up with texts
+            if len(miss_texts) == len(texts):
+                return new_embeddings
+            cached.update(new_items)
+        
+        embeddings = np.empty((len(texts), self.dimension), dtype=np.float32)
+        for row, key in enumerate(keys):
+            embeddings[row] = np.frombuffer(cached[key], dtype=np.float32)
+        return embeddings
+    
+    def _embed_uncached(self, texts: List[str]) -> np.ndarray:
+        """
+        Embed texts via the API in batches of EMBEDDING_BATCH_SIZE, with up to
+        EMBEDDING_MAX_WORKERS requests in flight at once
+        """
         if self.debug:
             print(f"  Creating embeddings for {len(texts)} texts...")
         
         try:
-            # Use OpenAI embeddings API
-            response = self.client.embeddings.create(
-                model=self.embedding_model,
-                input=texts
-            )
-            
-            # Extract embeddings
-            embeddings = np.array([item.embedding for item in response.data])
+            # Each batch writes its rows straight into one preallocated float32 array
+            embeddings = np.empty((len(texts), self.dimension), dtype=np.float32)
+            starts = range(0, len(texts), EMBEDDING_BATCH_SIZE)
+            batches = [texts[i:i + EMBEDDING_BATCH_SIZE] for i in starts]
+            outs = [embeddings[i:i + EMBEDDING_BATCH_SIZE] for i in starts]
             
-            # Verify dimension matches
-            if embeddings.shape[1] != self.dimension:
-                raise ValueError(
-                    f"Embedding dimension mismatch: expected {self.dimension}, "
-                    f"got {embeddings.shape[1]}. Update dimension parameter."
-                )
+            if len(batches) == 1:
+                self._embed_batch(batches[0], outs[0])
+            else:
+                with ThreadPoolExecutor(max_workers=min(EMBEDDING_MAX_WORKERS, len(batches))) as executor:
+                    # list() re-raises the first failed request
+                    list(executor.map(self._embed_batch, batches, outs))
             
             if self.debug:
                 print(f"  ✓ Created embeddings with shape: {embeddings.shape}")
@@ -116,17 +483,140 @@ class EmbeddingStore:
         
         # Create embeddings
         embeddings = self.create_embeddings(texts)
+        self._add_vectors(embeddings, metadata_list)
         
-        # Add to FAISS index
-        self.index.add(embeddings.astype('float32'))
+        if self.debug:
+            print(f"  ✓ Added {len(texts)} texts. Total vectors: {self.index.ntotal}")
+    
+    async def add_texts_async(self, texts: List[str], metadata_list: List[Dict],
+                              shard_size: int = EMBEDDING_BATCH_SIZE * EMBEDDING_MAX_WORKERS):
+        """
+        Add texts with metadata to the vector store, overlapping embedding of the next
+        shard (network-bound) with adding the previous shard to the index (CPU-bound)
+        
+        Args:
+            texts: List of texts to embed and add
+            metadata_list: List of metadata dictionaries (one per text)
+            shard_size: Texts embedded per pipeline step
+        """
+        if len(texts) != len(metadata_list):
+            raise ValueError("Number of texts must match number of metadata entries")
         
-        # Store metadata
-        self.metadata.extend(metadata_list)
+        if not texts:
+            return
+        
+        if len(texts) <= shard_size:
+            await asyncio.to_thread(self.add_texts, texts, metadata_list)
+            return
+        
+        if self.debug:
+            print(f"Adding {len(texts)} texts to vector store in shards of {shard_size}...")
+        
+        # Bounded queue: embedding runs at most two shards ahead of the index
+        queue = asyncio.Queue(maxsize=2)
+        
+        async def produce():
+            try:
+                for start in range(0, len(texts), shard_size):
+                    embeddings = await asyncio.to_thread(self.create_embeddings, texts[start:start + shard_size])
+                    await queue.put((embeddings, metadata_list[start:start + shard_size]))
+            finally:
+                await queue.put(None)
+        
+        async def consume():
+            while (item := await queue.get()) is not None:
+                await asyncio.to_thread(self._add_vectors, *item)
+        
+        producer = asyncio.create_task(produce())
+        try:
+            await consume()
+        except BaseException:
+            # Don't leave the producer blocked on a full queue
+            producer.cancel()
+            raise
+        await producer
         
         if self.debug:
             print(f"  ✓ Added {len(texts)} texts. Total vectors: {self.index.ntotal}")
     
-    def search(self, query: str, k: int = 5) -> List[Dict]:
+    def _add_vectors(self, embeddings: np.ndarray, metadata_list: List[Dict]):
+        """Add already-embedded vectors and their metadata to the index"""
+        with self._lock:
+            self._materialize_index()
+            
+            vectors = np.ascontiguousarray(embeddings, dtype='float32')
+            if self._uses_inner_product():
+                # Cosine similarity == inner product on unit vectors
+                faiss.normalize_L2(vectors)
+            if not self.index.is_trained:
+                self.index.train(vectors)
+            
+            # Add to FAISS index
+            self.index.add(vectors)
+            
+            # Store metadata
+            self.metadata.extend(metadata_list)
+            
+            self._maybe_upgrade_index()
+    
+    @staticmethod
+    def _split_labeled(labeled_texts: Iterable[Dict]) -> Tuple[List[str], List[Dict]]:
+        """Build (texts, metadata_list) from labeled texts in a single pass"""
+        texts = []
+        metadata_list = []
+        for lt in labeled_texts:
+            texts.append(lt['text'])
+            metadata_list.append({
+                'summary': lt['summary'],
+                'category': lt['category'],
+                'text': lt['text']
+            })
+        return texts, metadata_list
+    
+    def add_labeled(self, labeled_texts: Iterable[Dict]):
+        """
+        Add labeled texts (output of TextLabeler) to the vector store in a single pass
+        
+        Args:
+            labeled_texts: Iterable of dictionaries with 'text', 'summary', and 'category'
+        """
+        self.add_texts(*self._split_labeled(labeled_texts))
+    
+    def embed_labeled(self, labeled_texts: Iterable[Dict]) -> Tuple[np.ndarray, List[Dict]]:
+        """
+        Embed labeled texts without adding them, so the network-bound step can run before
+        taking index_file_lock and only add_embedded runs under it
+        
+        Args:
+            labeled_texts: Iterable of dictionaries with 'text', 'summary', and 'category'
+            
+        Returns:
+            Tuple of (embeddings, metadata_list) to pass to add_embedded
+        """
+        texts, metadata_list = self._split_labeled(labeled_texts)
+        return self.create_embeddings(texts), metadata_list
+    
+    def add_embedded(self, embeddings: np.ndarray, metadata_list: List[Dict]):
+        """
+        Add vectors returned by embed_labeled to the index
+        
+        Args:
+            embeddings: Embeddings, one row per metadata entry
+            metadata_list: List of metadata dictionaries
+        """
+        if metadata_list:
+            self._add_vectors(embeddings, metadata_list)
+    
+    async def add_labeled_async(self, labeled_texts: Iterable[Dict]):
+        """
+        Add labeled texts via the pipelined add_texts_async
+        
+        Args:
+            labeled_texts: Iterable of dictionaries with 'text', 'summary', and 'category'
+        """
+        await self.add_texts_async(*self._split_labeled(labeled_texts))
+    
+    def search(self, query: str, k: int = 5) -> List[Result]:
         """
         Search for similar texts
         
@@ -135,7 +625,7 @@ class EmbeddingStore:
             k: Number of results to return
             
         Returns:
-            List of dictionaries with 'text', 'category', 'summary', and 'distance'
+            List of Result tuples with 'summary', 'category', 'text', 'distance', and 'rank'
         """
         if self.index.ntotal == 0:
             if self.debug:
@@ -145,26 +635,79 @@ class EmbeddingStore:
         if self.debug:
             print(f"  Searching for: {query[:50]}...")
         
-        # Create embedding for query
-        query_embedding = self.create_embeddings([query])
-        
-        # Search in FAISS
-        distances, indices = self.index.search(query_embedding.astype('float32'), k)
+        # Create embedding for query (recent queries are served from memory)
+        # (searches run concurrently from worker threads; the API call happens outside the lock)
+        with self._query_cache_lock:
+            query_embedding = self._query_cache.get(query)
+            if query_embedding is not None:
+                self._query_cache.move_to_end(query)
+        if query_embedding is None:
+            query_embedding = self.create_embeddings([query])
+            with self._query_cache_lock:
+                self._query_cache[query] = query_embedding
+                self._query_cache.move_to_end(query)
+                if len(self._query_cache) > QUERY_CACHE_SIZE:
+                    self._query_cache.popitem(last=False)
         
-        # Get results with metadata
-        results = []
-        for i, (distance, idx) in enumerate(zip(distances[0], indices[0])):
-            if idx < len(self.metadata):
-                result = self.metadata[idx].copy()
-                result['distance'] = float(distance)
-                result['rank'] = i + 1
-                results.append(result)
+        results = self._search_vectors(query_embedding, k)[0]
         
         if self.debug:
             print(f"  ✓ Found {len(results)} results")
         
         return results
     
+    def search_batch(self, queries: List[str], k: int = 5) -> List[List[Result]]:
+        """
+        Search for similar texts for several queries at once
+        
+        All queries are embedded together and run through a single FAISS search,
+        which FAISS parallelizes across queries.
+        
+        Args:
+            queries: Query texts
+            k: Number of results to return per query
+            
+        Returns:
+            One result list per query (same format as search)
+        """
+        if not queries:
+            return []
+        if self.index.ntotal == 0:
+            if self.debug:
+                print("  ⚠ Vector store is empty")
+            return [[] for _ in queries]
+        
+        if self.debug:
+            print(f"  Searching for {len(queries)} queries...")
+        
+        return self._search_vectors(self.create_embeddings(queries), k)
+    
+    def _search_vectors(self, query_embeddings: np.ndarray, k: int) -> List[List[Result]]:
+        """Run one FAISS search for a (n_queries, dimension) array and attach metadata"""
+        # Search in FAISS
+        query_vectors = np.ascontiguousarray(query_embeddings, dtype='float32')
+        if self._uses_inner_product():
+            faiss.normalize_L2(query_vectors)
+        distances, indices = self.index.search(query_vectors, k)
+        
+        if self._uses_inner_product():
+            # Report squared L2 distance between unit vectors (2 - 2 * cosine) so that
+            # lower is still better for callers
+            distances = 2.0 - 2.0 * distances
+        
+        # Get results with metadata (approximate indexes pad missing hits with -1)
+        all_results = []
+        for row_distances, row_indices in zip(distances, indices):
+            results = []
+            for i, (distance, idx) in enumerate(zip(row_distances, row_indices)):
+                if 0 <= idx < len(self.metadata):
+                    meta = self.metadata[idx]
+                    results.append(Result(meta.get('summary', ''), meta.get('category', ''),
+                                          meta.get('text', ''), float(distance), i + 1))
+            all_results.append(results)
+        
+        return all_results
+    
     def save(self, index_path: str, metadata_path: str):
         """
         Save FAISS index and metadata to disk
@@ -174,24 +717,94 @@ class EmbeddingStore:
             metadata_path: Path to save metadata JSON
         """
         try:
-            # Save FAISS index
-            os.makedirs(os.path.dirname(index_path), exist_ok=True) if os.path.dirname(index_path) else None
-            faiss.write_index(self.index, index_path)
-            
-            # Save metadata
-            os.makedirs(os.path.dirname(metadata_path), exist_ok=True) if os.path.dirname(metadata_path) else None
-            with open(metadata_path, 'w', encoding='utf-8') as f:
-                json.dump(self.metadata, f, ensure_ascii=False, indent=2)
+            with self._lock:
+                # Write to temp files and rename over the originals, so processes that have the
+                # old index memory-mapped (including this one) keep reading a complete file
+                os.makedirs(os.path.dirname(index_path), exist_ok=True) if os.path.dirname(index_path) else None
+                faiss.write_index(self._cpu_index(), index_path + '.tmp')
+                os.replace(index_path + '.tmp', index_path)
+                self._save_vectors(vectors_path(index_path))
+                
+                # Save metadata (msgpack sidecar, or compact JSON without msgpack)
+                os.makedirs(os.path.dirname(metadata_path), exist_ok=True) if os.path.dirname(metadata_path) else None
+                if MSGPACK_AVAILABLE:
+                    metadata_file = msgpack_metadata_path(metadata_path)
+                    self._save_metadata_msgpack(metadata_file)
+                else:
+                    metadata_file = metadata_path
+                    with open(metadata_file + '.tmp', 'wb') as f:
+                        f.write(orjson.dumps(self.metadata))
+                    os.replace(metadata_file + '.tmp', metadata_file)
+                    self._metadata_synced = None
+                
+                self._synced_mtime = os.path.getmtime(index_path)
             
             if self.debug:
                 print(f"  ✓ Saved vector store to:")
                 print(f"    Index: {index_path}")
-                print(f"    Metadata: {metadata_path}")
+                print(f"    Metadata: {metadata_file}")
                 
         except Exception as e:
             print(f"  ✗ Error saving vector store: {e}")
             raise
     
+    def _save_vectors(self, vecs_path: str):
+        """
+        Write the index vectors as raw float32, dimension-major (call with lock held)
+        
+        The file holds a (dimension, n_vectors) array, so each dimension is one contiguous row
+        for tools that compute distances over many vectors at once without FAISS. Indexes that
+        can't reconstruct their vectors (IVF without a direct map) get no file.
+        """
+        self.vectors = None
+        vectors = None
+        if self.save_vectors:
+            try:
+                vectors = self._cpu_index().reconstruct_n(0, self.index.ntotal)
+            except RuntimeError as e:
+                if self.debug:
+                    print(f"  ⚠ Not writing vectors file: {e}")
+        
+        if vectors is None:
+            # Don't leave a file that no longer matches the index
+            if os.path.exists(vecs_path):
+                os.remove(vecs_path)
+            return
+        
+        np.ascontiguousarray(vectors.T, dtype='<f4').tofile(vecs_path + '.tmp')
+        os.replace(vecs_path + '.tmp', vecs_path)
+        self.vectors = self._map_vectors(vecs_path, self.index.d, self.index.ntotal)
+    
+    @staticmethod
+    def _map_vectors(vecs_path: str, dimension: int, n_vectors: int) -> Optional[np.ndarray]:
+        """Memory-map a '.vecs' file as (dimension, n_vectors), or None if missing or mismatched"""
+        if (n_vectors == 0 or not os.path.exists(vecs_path)
+                or os.path.getsize(vecs_path) != dimension * n_vectors * 4):
+            return None
+        return np.memmap(vecs_path, dtype='<f4', mode='r', shape=(dimension, n_vectors))
+    
+    def _save_metadata_msgpack(self, metadata_file: str):
+        """
+        Write metadata as a stream of msgpack entries (call with lock held)
+        
+        If the file is exactly as this store last loaded/saved it, only entries added
+        since then are appended; otherwise the whole file is rewritten.
+        """
+        metadata = self.metadata  # parses lazily loaded metadata, which also sets _metadata_synced
+        synced = self._metadata_synced
+        if (synced and synced[0] == metadata_file and synced[2] <= len(metadata)
+                and os.path.exists(metadata_file) and os.path.getsize(metadata_file) == synced[1]):
+            new_entries = self.metadata[synced[2]:]
+            if new_entries:
+                with open(metadata_file, 'ab') as f:
+                    f.write(b''.join(msgpack.packb(entry, use_bin_type=True) for entry in new_entries))
+        else:
+            with open(metadata_file + '.tmp', 'wb') as f:
+                f.write(b''.join(msgpack.packb(entry, use_bin_type=True) for entry in self.metadata))
+            os.replace(metadata_file + '.tmp', metadata_file)
+        
+        self._metadata_synced = (metadata_file, os.path.getsize(metadata_file), len(self.metadata))
+    
     def load(self, index_path: str, metadata_path: str):
         """
         Load FAISS index and metadata from disk
@@ -205,17 +818,39 @@ class EmbeddingStore:
             if not os.path.exists(index_path):
                 raise FileNotFoundError(f"Index file not found: {index_path}")
             
-            self.index = faiss.read_index(index_path)
+            index, mmapped = self._read_index(index_path)
+            mtime = os.path.getmtime(index_path)
+            
+            # efSearch / nprobe are not stored in the index file
+            if hasattr(index, 'hnsw'):
+                index.hnsw.efSearch = self.ef_search
+            ivf_index = faiss.downcast_index(index.base_index) if hasattr(index, 'base_index') else index
+            if hasattr(ivf_index, 'nprobe'):
+                ivf_index.nprobe = self.nprobe
             
             # Load metadata
-            if not os.path.exists(metadata_path):
+            metadata_file = saved_metadata_path(metadata_path)
+            if metadata_file is None:
                 raise FileNotFoundError(f"Metadata file not found: {metadata_path}")
             
-            with open(metadata_path, 'r', encoding='utf-8') as f:
-                self.metadata = json.load(f)
+            # Read now (the file may be appended to later) but parse on first use, so loading
+            # a large store doesn't wait on deserializing every entry
+            with open(metadata_file, 'rb') as f:
+                raw = f.read()
             
-            # Update dimension from loaded index
-            self.dimension = self.index.d
+            vectors = self._map_vectors(vectors_path(index_path), index.d, index.ntotal)
+            
+            with self._lock:
+                self._set_index(index, mmapped)
+                with self._metadata_load_lock:
+                    self._metadata = []
+                    self._metadata_loader = lambda: self._parse_metadata(metadata_file, raw)
+                self.vectors = vectors
+                self._synced_mtime = mtime
+                self._metadata_synced = None
+                
+                # Update dimension from loaded index
+                self.dimension = self.index.d
         
             if self.debug:
                 print(f"  ✓ Loaded vector store:")
@@ -226,41 +861,161 @@ class EmbeddingStore:
             print(f"  ✗ Error loading vector store: {e}")
             raise
 
+    
+    def _parse_metadata(self, metadata_file: str, raw: bytes) -> List[Dict]:
+        """Deserialize a metadata file read by load() (called once, on first access)"""
+        if not metadata_file.endswith('.mp'):
+            return orjson.loads(raw)
+        
+        # Stream of one entry per object (older files hold a single list)
+        metadata = []
+        for obj in msgpack.Unpacker(io.BytesIO(raw), raw=False):
+            if isinstance(obj, list):
+                metadata.extend(obj)
+            else:
+                metadata.append(obj)
+        self._metadata_synced = (metadata_file, len(raw), len(metadata))
+        return metadata
+    
+    def load_if_changed(self, index_path: str, metadata_path: str) -> bool:
+        """
+        Load FAISS index and metadata only if they exist and the index file changed
+        since this store last loaded or saved it (e.g. written by another worker)
+        
+        Args:
+            index_path: Path to FAISS index file
+            metadata_path: Path to metadata JSON file
+            
+        Returns:
+            True if the store was (re)loaded from disk
+        """
+        if not os.path.exists(index_path) or saved_metadata_path(metadata_path) is None:
+            return False
+        
+        if self._synced_mtime is not None and os.path.getmtime(index_path) <= self._synced_mtime:
+            return False
+        
+        self.load(index_path, metadata_path)
+        return True
+
 
-def load_labeled_json(file_path: str) -> List[Dict]:
+@contextmanager
+def index_file_lock(index_path: str):
+    """
+    Hold an exclusive cross-process lock (flock on a .lock file beside index_path), so one
+    worker's load-if-changed + add + save can't interleave with another's and replace the
+    index without its vectors
+    
+    Args:
+        index_path: Path to FAISS index file
+    """
+    with open(index_path + '.lock', 'a') as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def vectors_path(index_path: str) -> str:
+    """Path of the raw float32 vectors file stored alongside index_path"""
+    return index_path + '.vecs'
+
+
+def msgpack_metadata_path(metadata_path: str) -> str:
+    """Path of the msgpack metadata file stored alongside metadata_path"""
+    return metadata_path + '.mp'
+
+
+def saved_metadata_path(metadata_path: str) -> Optional[str]:
+    """
+    Find the metadata file to load for metadata_path
+    
+    Args:
+        metadata_path: Metadata JSON path passed to save/load
+        
+    Returns:
+        The newer of the msgpack sidecar (if msgpack is installed) and the JSON file,
+        or None if neither exists
+    """
+    candidates = [metadata_path]
+    if MSGPACK_AVAILABLE:
+        candidates.append(msgpack_metadata_path(metadata_path))
+    existing = [path for path in candidates if os.path.exists(path)]
+    if not existing:
+        return None
+    return max(existing, key=os.path.getmtime)
+
+
+def load_labeled_json(file_path: str) -> Tuple[List[str], List[Dict]]:
     """
     Load labeled texts from JSON lines file
     
+    Uses pyarrow's JSON reader when installed; falls back to a line-by-line parse (which skips
+    invalid lines) without pyarrow or when the file has malformed lines.
+    
     Args:
         file_path: Path to JSON lines file
         
     Returns:
-        List of dictionaries with 'summary', 'category', and 'text'
+        Tuple of (texts, metadata dictionaries with 'summary', 'category', and 'text');
+        each text string is shared between both lists, not copied
     """
+    if PYARROW_AVAILABLE:
+        try:
+            return _load_labeled_json_arrow(file_path)
+        except (pa.ArrowInvalid, pa.ArrowNotImplementedError) as e:
+            print(f"  ⚠ pyarrow could not parse {file_path} ({e}), falling back to line-by-line parsing")
+    
     texts = []
     metadata_list = []
     
-    with open(file_path, 'r', encoding='utf-8') as f:
+    with open(file_path, 'rb') as f:
         for line in f:
             line = line.strip()
             if not line:
                 continue
             
             try:
-                data = json.loads(line)
-                texts.append(data.get('text', ''))
+                data = orjson.loads(line)
+                text = data.get('text', '')
+                texts.append(text)
                 metadata_list.append({
                     'summary': data.get('summary', ''),
                     'category': data.get('category', 'world'),
-                    'text': data.get('text', '')
+                    'text': text
                 })
-            except json.JSONDecodeError as e:
+            except orjson.JSONDecodeError as e:
                 print(f"  ⚠ Skipping invalid JSON line: {e}")
                 continue
     
     return texts, metadata_list
 
 
+def _load_labeled_json_arrow(file_path: str) -> Tuple[List[str], List[Dict]]:
+    """Parse a labeled JSON lines file in one pass with pyarrow (raises ArrowInvalid on bad lines)"""
+    schema = pa.schema([('text', pa.string()), ('summary', pa.string()), ('category', pa.string())])
+    table = paj.read_json(
+        file_path,
+        read_options=paj.ReadOptions(block_size=1 << 20),
+        parse_options=paj.ParseOptions(explicit_schema=schema, unexpected_field_behavior='ignore')
+    )
+    
+    # Missing keys come back as nulls; apply the same defaults as the line-by-line path
+    texts = [text if text is not None else '' for text in table.column('text').to_pylist()]
+    summaries = table.column('summary').to_pylist()
+    categories = table.column('category').to_pylist()
+    metadata_list = [
+        {
+            'summary': summary if summary is not None else '',
+            'category': category if category is not None else 'world',
+            'text': text
+        }
+        for text, summary, category in zip(texts, summaries, categories)
+    ]
+    return texts, metadata_list
+
+
 if __name__ == "__main__":
     import sys
     
@@ -302,9 +1057,9 @@ if __name__ == "__main__":
         print("\nStep 2: Initializing embedding store...")
         store = EmbeddingStore(debug=True)
         
-        # Create embeddings and add to store
+        # Create embeddings and add to store (embedding overlaps index adds for large files)
         print("\nStep 3: Creating embeddings...")
-        store.add_texts(texts, metadata_list)
+        asyncio.run(store.add_texts_async(texts, metadata_list))
         
         # Save vector store
         print("\nStep 4: Saving vector store...")
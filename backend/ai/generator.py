@@ -1,6 +1,12 @@
+import io
 import os
 import json
-from typing import Optional, Dict
+import time
+import hashlib
+import threading
+import httpx
+from collections import OrderedDict
+from typing import Optional, Dict, Union
 from dotenv import load_dotenv
 
 load_dotenv(dotenv_path='.env')
@@ -8,6 +14,15 @@ load_dotenv(dotenv_path='.env')
 # Lazy import replicate to avoid compatibility issues with Python 3.14 at startup
 # Only import when ImageGenerator is actually instantiated
 
+# Recent generation results, shared by all ImageGenerator instances:
+# (prompt, aspect_ratio, number_of_images, prompt_optimizer, reference digest) -> (created_at, image_urls)
+# Entries expire before Replicate's delivery URLs do; least recently used entries are evicted
+# beyond RESULT_CACHE_SIZE
+RESULT_CACHE_TTL = 30 * 60
+RESULT_CACHE_SIZE = 128
+_result_cache: OrderedDict = OrderedDict()
+_result_cache_lock = threading.Lock()
+
 
 class ImageGenerator:
     def __init__(self, debug: bool = False):
@@ -36,13 +51,21 @@ class ImageGenerator:
         except Exception as e:
             raise RuntimeError(f"Error initializing replicate: {e}. This may be due to Python 3.14 compatibility issues. Consider using Python 3.13 or earlier.")
         
+        # Keep-alive HTTP/2 pool reused for every image download (thread-safe)
+        self._http = httpx.Client(
+            http2=True,
+            timeout=60,
+            follow_redirects=True,
+            limits=httpx.Limits(max_keepalive_connections=32),
+        )
+        
         if debug:
             print("✓ ImageGenerator initialized with Replicate API")
     
     def generate_image(
         self,
         prompt: str,
-        subject_reference: str,
+        subject_reference: Union[str, bytes],
         aspect_ratio: str = "3:4",
         number_of_images: int = 1,
         prompt_optimizer: bool = True
@@ -52,7 +75,7 @@ class ImageGenerator:
         
         Args:
             prompt: Text prompt describing the desired output
-            subject_reference: Path or URL to the base/reference image
+            subject_reference: Path or URL to the base/reference image, or its raw bytes
             aspect_ratio: Aspect ratio for the output (default: "3:4")
             number_of_images: Number of images to generate (default: 1)
             prompt_optimizer: Whether to optimize the prompt (default: True)
@@ -60,16 +83,48 @@ class ImageGenerator:
         Returns:
             Dictionary with generated image URLs and metadata, or None
         """
+        reference_file = None
         try:
             if self.debug:
                 print(f"Generating image with minimax/image-01...")
                 print(f"  Prompt: {prompt}")
-                print(f"  Subject Reference: {subject_reference}")
+                if isinstance(subject_reference, str):
+                    print(f"  Subject Reference: {subject_reference}")
+                else:
+                    print(f"  Subject Reference: <{len(subject_reference)} bytes>")
                 print(f"  Aspect Ratio: {aspect_ratio}")
             
-            # Handle local file paths - open as file object for Replicate
-            if os.path.exists(subject_reference) and not subject_reference.startswith(('http://', 'https://')):
-                subject_reference = open(subject_reference, 'rb')
+            # Handle raw bytes (already read by the caller) and local file paths -
+            # pass as file object for Replicate; URLs are passed through unopened
+            if isinstance(subject_reference, (bytes, bytearray)):
+                reference_digest = hashlib.sha256(subject_reference).hexdigest()
+                reference_input = io.BytesIO(subject_reference)
+            elif not subject_reference.startswith(('http://', 'https://')) and os.path.exists(subject_reference):
+                with open(subject_reference, 'rb') as f:
+                    reference_bytes = f.read()
+                reference_digest = hashlib.sha256(reference_bytes).hexdigest()
+                reference_input = reference_file = io.BytesIO(reference_bytes)
+            else:
+                reference_digest = subject_reference
+                reference_input = subject_reference
+            
+            cache_key = (prompt, aspect_ratio, number_of_images, prompt_optimizer, reference_digest)
+            with _result_cache_lock:
+                cached = _result_cache.get(cache_key)
+                if cached and time.time() - cached[0] >= RESULT_CACHE_TTL:
+                    del _result_cache[cache_key]
+                    cached = None
+                elif cached:
+                    _result_cache.move_to_end(cache_key)
+            if cached:
+                if self.debug:
+                    print(f"  ✓ Using cached result ({len(cached[1])} image(s))")
+                return {
+                    'image_urls': list(cached[1]),
+                    'prompt': prompt,
+                    'subject_reference': subject_reference,
+                    'aspect_ratio': aspect_ratio
+                }
             
             # Run the model
             output = self.replicate.run(
@@ -79,7 +134,7 @@ class ImageGenerator:
                     "aspect_ratio": aspect_ratio,
                     "number_of_images": number_of_images,
                     "prompt_optimizer": prompt_optimizer,
-                    "subject_reference": subject_reference
+                    "subject_reference": reference_input
                 }
             )
             
@@ -96,6 +151,13 @@ class ImageGenerator:
             elif isinstance(output, str):
                 image_urls.append(output)
             
+            if image_urls:
+                with _result_cache_lock:
+                    _result_cache[cache_key] = (time.time(), tuple(image_urls))
+                    _result_cache.move_to_end(cache_key)
+                    if len(_result_cache) > RESULT_CACHE_SIZE:
+                        _result_cache.popitem(last=False)
+            
             result = {
                 'image_urls': image_urls,
                 'prompt': prompt,
@@ -116,6 +178,9 @@ class ImageGenerator:
                 import traceback
                 traceback.print_exc()
             return None
+        finally:
+            if reference_file is not None:
+                reference_file.close()
     
     def save_image(self, image_url: str, output_path: str) -> bool:
         """
@@ -132,8 +197,7 @@ class ImageGenerator:
             if self.debug:
                 print(f"Downloading image to: {output_path}")
             
-            import requests
-            response = requests.get(image_url, timeout=60)
+            response = self._http.get(image_url)
             response.raise_for_status()
             
             # Create directory if needed
@@ -152,6 +216,10 @@ class ImageGenerator:
             if self.debug:
                 print(f"  ✗ Error downloading image: {e}")
             return False
+    
+    def close(self):
+        """Close the pooled HTTP connections used for downloads"""
+        self._http.close()
 
 
 if __name__ == "__main__":
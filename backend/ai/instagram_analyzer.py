@@ -1,25 +1,113 @@
 import os
 import re
+import asyncio
 import base64
+import hashlib
+import sqlite3
+import threading
+import httpx
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Optional
 from dotenv import load_dotenv
-from openai import OpenAI
+from openai import OpenAI, AsyncOpenAI
 from PIL import Image
 import io
 
 load_dotenv(dotenv_path='.env')
 
+# JPEG downscaling uses libvips when installed (shrink-on-load, SIMD resampling); Pillow otherwise
+try:
+    import pyvips
+    PYVIPS_AVAILABLE = True
+except (ImportError, OSError):
+    PYVIPS_AVAILABLE = False
+
+# One pass over an instagram_photos_*.txt export: each match is either a 'Photo ' marker
+# (starts a new photo) or one of its fields
+_PHOTO_TOKEN_RE = re.compile(
+    r'(?P<photo>Photo )'
+    r'|Image URL: (?P<image_url>https://[^\n]+)'
+    r'|URL: (?P<url>https://[^\n]+)'
+    r'|Caption: (?P<caption>(?:(?!Photo ).)+?)(?=\n[A-Z]|\n===)'
+    r'|Timestamp: (?P<timestamp>[^\n]+)',
+    re.DOTALL
+)
+
+# Concurrent image downloads, resize/encode jobs and vision requests per analyze_profile_photos call
+DOWNLOAD_CONCURRENCY = 8
+ENCODE_CONCURRENCY = os.cpu_count() or 1
+ANALYSIS_CONCURRENCY = 5
+
+# Image downloads are retried on transient CDN errors with exponential backoff (0.5s, 1s, 2s)
+DOWNLOAD_RETRIES = 3
+DOWNLOAD_BACKOFF = 0.5
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+# Worker threads for PIL/libvips resize + encode, shared by all analyzers (created on first use).
+# Pillow and libjpeg release the GIL, so photos are encoded on all cores in parallel
+_encode_pool: Optional[ThreadPoolExecutor] = None
+_encode_pool_lock = threading.Lock()
+
+
+def _get_encode_pool() -> ThreadPoolExecutor:
+    global _encode_pool
+    with _encode_pool_lock:
+        if _encode_pool is None:
+            _encode_pool = ThreadPoolExecutor(max_workers=ENCODE_CONCURRENCY, thread_name_prefix="image-encode")
+        return _encode_pool
+
+# Vision model used for per-photo analyses and the profile summary
+VISION_MODEL = "gpt-4o"  # or "gpt-4-vision-preview" for older models
+
+# On-disk cache of per-photo analyses (SQLite, keyed by a hash of model + prompt + image bytes);
+# pass cache_path=None to disable
+DEFAULT_CACHE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                  "data", "image_analysis_cache.sqlite")
+# Each photo analysis is cut to this many characters in the profile summary prompt
+SUMMARY_ANALYSIS_CHARS = 400
+
+# In-process LRU of profile summaries, keyed by a hash of the summary prompt
+SUMMARY_CACHE_SIZE = 64
+_summary_cache: OrderedDict = OrderedDict()
+_summary_cache_lock = threading.Lock()
+
+
+def _data_uri(mime_type: str, data) -> str:
+    """
+    Base64 data URI for image bytes
+    
+    The URI is assembled as bytes and decoded once (ASCII, since base64 is 7-bit), so at most
+    two full-size copies exist at a time instead of the encoded bytes, their str copy and the
+    concatenated URI.
+    """
+    uri = bytearray(b"data:")
+    uri += mime_type.encode('ascii')
+    uri += b";base64,"
+    uri += base64.b64encode(data)
+    return uri.decode('ascii')
+
 
 class InstagramImageAnalyzer:
-    def __init__(self, debug: bool = False):
+    def __init__(self, debug: bool = False, resample_filter: Image.Resampling = Image.Resampling.BICUBIC,
+                 cache_path: Optional[str] = DEFAULT_CACHE_PATH, pass_image_urls: bool = False):
         """
         Initialize Instagram image analyzer
         
         Args:
             debug: Print debug information
+            resample_filter: PIL filter used when downscaling photos before analysis
+            cache_path: SQLite file caching photo analyses across runs (None disables it)
+            pass_image_urls: Send publicly reachable image URLs to the model as-is instead of
+                             downloading and base64-encoding them (falls back to the download
+                             when the URL probe or the model's fetch fails)
         """
         self.debug = debug
+        self.resample_filter = resample_filter
+        self.pass_image_urls = pass_image_urls
         self.client = None
         
         # Initialize OpenAI client
@@ -28,11 +116,27 @@ class InstagramImageAnalyzer:
             raise ValueError("OPENAI_API_KEY required in .env file")
         
         self.client = OpenAI(api_key=api_key)
+        # Async clients are created per analyze_profile_photos run, on that run's event loop
+        self._api_key = api_key
+        
+        # Analyses of photos seen before are reused instead of re-encoding and re-asking the model
+        self._cache = self._open_cache(cache_path) if cache_path else None
+        self._cache_lock = threading.Lock()
         
         # Headers for downloading images
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
         }
+        
+        # Keep-alive session for download_image, retrying transient CDN errors
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        self.session.mount('https://', HTTPAdapter(
+            pool_connections=20,
+            pool_maxsize=20,
+            max_retries=Retry(total=DOWNLOAD_RETRIES, backoff_factor=DOWNLOAD_BACKOFF,
+                              status_forcelist=RETRY_STATUSES, allowed_methods=['GET', 'HEAD'])
+        ))
     
     def parse_instagram_photos_file(self, file_path: str) -> List[Dict]:
         """
@@ -49,34 +153,21 @@ class InstagramImageAnalyzer:
         with open(file_path, 'r', encoding='utf-8') as f:
             content = f.read()
         
-        # Split by photo separator
-        photo_sections = content.split('Photo ')
-        
-        for section in photo_sections[1:]:  # Skip first empty section
-            photo_data = {}
-            
-            # Extract URL
-            url_match = re.search(r'URL: (https://[^\n]+)', section)
-            if url_match:
-                photo_data['url'] = url_match.group(1)
-            
-            # Extract Image URL
-            image_url_match = re.search(r'Image URL: (https://[^\n]+)', section)
-            if image_url_match:
-                photo_data['image_url'] = image_url_match.group(1)
-            
-            # Extract caption
-            caption_match = re.search(r'Caption: (.+?)(?=\n[A-Z]|\n===)', section, re.DOTALL)
-            if caption_match:
-                photo_data['caption'] = caption_match.group(1).strip()
-            
-            # Extract timestamp
-            timestamp_match = re.search(r'Timestamp: ([^\n]+)', section)
-            if timestamp_match:
-                photo_data['timestamp'] = timestamp_match.group(1)
-            
-            if photo_data.get('image_url'):
-                photos.append(photo_data)
+        # Fields before the first 'Photo ' marker (file header) are ignored;
+        # the first occurrence of each field within a photo wins
+        photo_data = None
+        for match in _PHOTO_TOKEN_RE.finditer(content):
+            field = match.lastgroup
+            if field == 'photo':
+                if photo_data and photo_data.get('image_url'):
+                    photos.append(photo_data)
+                photo_data = {}
+            elif photo_data is not None and field not in photo_data:
+                value = match.group(field)
+                photo_data[field] = value.strip() if field == 'caption' else value
+        
+        if photo_data and photo_data.get('image_url'):
+            photos.append(photo_data)
         
         if self.debug:
             print(f"✓ Parsed {len(photos)} photos from file")
@@ -94,23 +185,87 @@ class InstagramImageAnalyzer:
             Image bytes or None if failed
         """
         try:
-            response = requests.get(image_url, headers=self.headers, timeout=30)
-            response.raise_for_status()
-            
-            # Check if it's actually an image
-            content_type = response.headers.get('content-type', '')
-            if 'image' not in content_type:
-                if self.debug:
-                    print(f"  ⚠ URL doesn't appear to be an image: {content_type}")
-                return None
-            
-            return response.content
+            # Headers are checked before the body is read, so non-image responses aren't downloaded
+            with self.session.get(image_url, timeout=30, stream=True) as response:
+                return response.content if self._is_image_response(response) else None
             
         except Exception as e:
             if self.debug:
                 print(f"  ✗ Error downloading image: {e}")
             return None
     
+    def _open_cache(self, cache_path: str) -> Optional[sqlite3.Connection]:
+        """Open (or create) the SQLite analysis cache; returns None if it can't be opened"""
+        try:
+            os.makedirs(os.path.dirname(cache_path), exist_ok=True) if os.path.dirname(cache_path) else None
+            conn = sqlite3.connect(cache_path, check_same_thread=False)
+            conn.execute("CREATE TABLE IF NOT EXISTS analyses (key BLOB PRIMARY KEY, analysis TEXT)")
+            conn.commit()
+            return conn
+        except Exception as e:
+            print(f"  ⚠ Image analysis cache disabled: {e}")
+            return None
+    
+    def _cache_key(self, image_bytes: bytes, caption: str = "") -> bytes:
+        """
+        Hash of everything that determines an analysis: model, full prompt and image content
+        (the encoded URL stands in for the content when the image is passed by URL)
+        """
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(f"{VISION_MODEL}\0{self._vision_prompt(caption)}\0".encode('utf-8'))
+        digest.update(image_bytes)
+        return digest.digest()
+    
+    def _cache_get(self, key: bytes) -> Optional[str]:
+        if self._cache is None:
+            return None
+        with self._cache_lock:
+            row = self._cache.execute("SELECT analysis FROM analyses WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+    
+    def _cache_put(self, key: bytes, analysis: str):
+        if self._cache is None:
+            return
+        with self._cache_lock:
+            self._cache.execute("INSERT OR REPLACE INTO analyses (key, analysis) VALUES (?, ?)", (key, analysis))
+            self._cache.commit()
+    
+    def _is_image_response(self, response) -> bool:
+        """Whether a response is a successful image response (raises on HTTP errors)"""
+        response.raise_for_status()
+        
+        # Check if it's actually an image
+        content_type = response.headers.get('content-type', '')
+        if 'image' not in content_type:
+            if self.debug:
+                print(f"  ⚠ URL doesn't appear to be an image: {content_type}")
+            return False
+        
+        return True
+    
+    async def _download_image_async(self, client: httpx.AsyncClient, semaphore: asyncio.Semaphore,
+                                    image_url: str) -> Optional[bytes]:
+        """Download one image on a shared client, retrying transient errors (None if failed)"""
+        async with semaphore:
+            for attempt in range(DOWNLOAD_RETRIES + 1):
+                try:
+                    async with client.stream('GET', image_url) as response:
+                        if response.status_code in RETRY_STATUSES and attempt < DOWNLOAD_RETRIES:
+                            await asyncio.sleep(DOWNLOAD_BACKOFF * 2 ** attempt)
+                            continue
+                        return await response.aread() if self._is_image_response(response) else None
+                except httpx.TransportError as e:
+                    if attempt < DOWNLOAD_RETRIES:
+                        await asyncio.sleep(DOWNLOAD_BACKOFF * 2 ** attempt)
+                        continue
+                    if self.debug:
+                        print(f"  ✗ Error downloading image: {e}")
+                    return None
+                except Exception as e:
+                    if self.debug:
+                        print(f"  ✗ Error downloading image: {e}")
+                    return None
+    
     def image_to_base64(self, image_bytes: bytes, max_size: int = 1024) -> Optional[str]:
         """
         Convert image bytes to base64, optionally resizing to reduce size
@@ -123,15 +278,32 @@ class InstagramImageAnalyzer:
             Base64 encoded string with data URI prefix
         """
         try:
-            # Open image with PIL
+            # Open image with PIL (BytesIO shares the bytes buffer rather than copying it);
+            # only the header is read until pixel data is needed
             img = Image.open(io.BytesIO(image_bytes))
             
             # Get format
             img_format = img.format or 'JPEG'
             
+            # Already a JPEG within the size budget: send the original bytes, no decode/re-encode
+            if (img_format == 'JPEG' and img.mode in ('RGB', 'L')
+                    and (not max_size or (img.width <= max_size and img.height <= max_size))):
+                return _data_uri("image/jpeg", image_bytes)
+            
+            if PYVIPS_AVAILABLE and max_size and img_format == 'JPEG':
+                try:
+                    return self._vips_jpeg_to_base64(image_bytes, max_size)
+                except pyvips.Error as e:
+                    if self.debug:
+                        print(f"  ⚠ libvips failed, resizing with Pillow: {e}")
+            
+            # Let libjpeg scale down by 1/2, 1/4 or 1/8 while decoding (still >= max_size)
+            if img_format == 'JPEG' and max_size:
+                img.draft('RGB', (max_size, max_size))
+            
             # Resize if too large (to reduce API costs)
             if max_size and (img.width > max_size or img.height > max_size):
-                img.thumbnail((max_size, max_size), Image.Resampling.LANCZOS)
+                img.thumbnail((max_size, max_size), self.resample_filter)
             
             # Convert to RGB if necessary (for JPEG)
             if img_format == 'JPEG' and img.mode != 'RGB':
@@ -140,22 +312,25 @@ class InstagramImageAnalyzer:
             # Save to bytes
             buffer = io.BytesIO()
             img.save(buffer, format=img_format, quality=85)
-            image_bytes = buffer.getvalue()
-            
-            # Encode to base64
-            base64_image = base64.b64encode(image_bytes).decode('utf-8')
             
             # Determine MIME type
             mime_type = f"image/{img_format.lower()}" if img_format else "image/jpeg"
             
-            # Return data URI format
-            return f"data:{mime_type};base64,{base64_image}"
+            # Return data URI format (encoded from a view of the buffer, without copying it out)
+            with buffer.getbuffer() as encoded:
+                return _data_uri(mime_type, encoded)
             
         except Exception as e:
             if self.debug:
                 print(f"  ✗ Error converting image to base64: {e}")
             return None
     
+    def _vips_jpeg_to_base64(self, image_bytes: bytes, max_size: int) -> str:
+        """JPEG-only image_to_base64 using libvips (uses its own resampling kernel, not resample_filter)"""
+        thumbnail = pyvips.Image.thumbnail_buffer(image_bytes, max_size, height=max_size, size='down')
+        jpeg_bytes = thumbnail.jpegsave_buffer(Q=85, strip=True)
+        return _data_uri("image/jpeg", jpeg_bytes)
+    
     def analyze_image(self, base64_image: str, caption: str = "", prompt: str = None) -> Optional[str]:
         """
         Analyze a single image using GPT-4 Vision
@@ -168,6 +343,29 @@ class InstagramImageAnalyzer:
         Returns:
             Analysis text or None
         """
+        try:
+            response = self.client.chat.completions.create(**self._vision_request(base64_image, caption, prompt))
+            return response.choices[0].message.content
+            
+        except Exception as e:
+            if self.debug:
+                print(f"  ✗ Error analyzing image: {e}")
+            return None
+    
+    async def _analyze_image_async(self, aclient: AsyncOpenAI, semaphore: asyncio.Semaphore,
+                                   base64_image: str, caption: str = "") -> Optional[str]:
+        """Async analyze_image on a shared client, at most ANALYSIS_CONCURRENCY in flight"""
+        async with semaphore:
+            try:
+                response = await aclient.chat.completions.create(**self._vision_request(base64_image, caption))
+                return response.choices[0].message.content
+            except Exception as e:
+                if self.debug:
+                    print(f"  ✗ Error analyzing image: {e}")
+                return None
+    
+    def _vision_prompt(self, caption: str = "", prompt: str = None) -> str:
+        """Analysis prompt for one image, with the caption appended"""
         if not prompt:
             prompt = """Analyze this Instagram photo and describe:
 1. What the person is doing or what the photo shows
@@ -181,40 +379,145 @@ Be concise but insightful. Focus on what this photo reveals about the person's i
         if caption:
             prompt += f"\n\nInstagram caption: {caption}"
         
-        try:
-            response = self.client.chat.completions.create(
-                model="gpt-4o",  # or "gpt-4-vision-preview" for older models
-                messages=[
-                    {
-                        "role": "user",
-                        "content": [
-                            {
-                                "type": "text",
-                                "text": prompt
-                            },
-                            {
-                                "type": "image_url",
-                                "image_url": {
-                                    "url": base64_image
-                                }
+        return prompt
+    
+    def _vision_request(self, base64_image: str, caption: str = "", prompt: str = None) -> Dict:
+        """Chat completion arguments for analyzing one image"""
+        return {
+            'model': VISION_MODEL,
+            'messages': [
+                {
+                    "role": "user",
+                    "content": [
+                        {
+                            "type": "text",
+                            "text": self._vision_prompt(caption, prompt)
+                        },
+                        {
+                            "type": "image_url",
+                            "image_url": {
+                                "url": base64_image
                             }
-                        ]
-                    }
-                ],
-                max_tokens=300
+                        }
+                    ]
+                }
+            ],
+            'max_tokens': 300
+        }
+    
+    async def _is_public_image(self, client: httpx.AsyncClient, semaphore: asyncio.Semaphore,
+                               image_url: str) -> bool:
+        """HEAD-probe whether a URL serves an image without cookies (so the model can fetch it)"""
+        async with semaphore:
+            try:
+                response = await client.head(image_url)
+                return response.status_code == 200 and 'image' in response.headers.get('content-type', '')
+            except httpx.HTTPError:
+                return False
+    
+    async def _analyze_photos_async(self, photos: List[Dict]) -> List[Optional[str]]:
+        """
+        Download, encode and analyze photos as a pipeline
+        
+        Each photo moves through the three stages on its own, so one photo's resize runs
+        while others are downloading or being analyzed. Every stage has its own limit
+        (DOWNLOAD_CONCURRENCY, ENCODE_CONCURRENCY worker threads, ANALYSIS_CONCURRENCY).
+        Repeated photos (same URL and caption, or identical downloaded bytes) are only
+        processed once and share the result.
+        
+        Args:
+            photos: Photo dictionaries with 'image_url' (and optional 'caption')
+            
+        Returns:
+            Analysis text (or None if any step failed) for each photo, in order
+        """
+        download_semaphore = asyncio.Semaphore(DOWNLOAD_CONCURRENCY)
+        encode_pool = _get_encode_pool()
+        analysis_semaphore = asyncio.Semaphore(ANALYSIS_CONCURRENCY)
+        # Encode + analyze tasks by content cache key, so byte-identical images behind
+        # different (re-signed) URLs are analyzed once
+        content_tasks = {}
+        
+        async def analyze_bytes(cache_key: bytes, image_bytes: bytes, caption: str) -> Optional[str]:
+            # PIL decode/resize/encode is CPU-bound; run it on the encode pool, off the event loop
+            base64_image = await asyncio.get_running_loop().run_in_executor(
+                encode_pool, self.image_to_base64, image_bytes, 1024
             )
+            if not base64_image:
+                return None
             
-            return response.choices[0].message.content
+            analysis = await self._analyze_image_async(aclient, analysis_semaphore, base64_image, caption)
+            if analysis:
+                self._cache_put(cache_key, analysis)
+            return analysis
+        
+        async def process(photo: Dict) -> Optional[str]:
+            image_url = photo['image_url']
+            if self.pass_image_urls and await self._is_public_image(http_client, download_semaphore, image_url):
+                cache_key = self._cache_key(image_url.encode('utf-8'), photo.get('caption', ''))
+                analysis = self._cache_get(cache_key)
+                if analysis is None:
+                    # Let the model fetch the image itself: no download, resize or base64 here
+                    analysis = await self._analyze_image_async(aclient, analysis_semaphore, image_url,
+                                                               photo.get('caption', ''))
+                    if analysis:
+                        self._cache_put(cache_key, analysis)
+                if analysis:
+                    return analysis
+            
+            image_bytes = await self._download_image_async(http_client, download_semaphore, image_url)
+            if not image_bytes:
+                return None
             
-        except Exception as e:
-            if self.debug:
-                print(f"  ✗ Error analyzing image: {e}")
-            return None
+            cache_key = self._cache_key(image_bytes, photo.get('caption', ''))
+            cached = self._cache_get(cache_key)
+            if cached is not None:
+                return cached
+            
+            if cache_key not in content_tasks:
+                content_tasks[cache_key] = asyncio.ensure_future(
+                    analyze_bytes(cache_key, image_bytes, photo.get('caption', ''))
+                )
+            return await content_tasks[cache_key]
+        
+        # Collapse photos repeated in the export (carousels, reposts) before downloading
+        unique_index = {}
+        unique_photos = []
+        for photo in photos:
+            key = (photo['image_url'], photo.get('caption', ''))
+            if key not in unique_index:
+                unique_index[key] = len(unique_photos)
+                unique_photos.append(photo)
+        
+        # HTTP/2 pool for the vision requests: they multiplex over one connection to the API
+        # instead of queueing on the SDK's default connection limits
+        openai_http = httpx.AsyncClient(
+            http2=True,
+            limits=httpx.Limits(max_connections=50, max_keepalive_connections=50),
+            timeout=httpx.Timeout(60.0, connect=10.0)
+        )
+        aclient = AsyncOpenAI(api_key=self._api_key, http_client=openai_http)
+        try:
+            async with httpx.AsyncClient(
+                headers=self.headers,
+                timeout=30,
+                follow_redirects=True,
+                limits=httpx.Limits(max_connections=DOWNLOAD_CONCURRENCY * 2)
+            ) as http_client:
+                results = await asyncio.gather(*(process(photo) for photo in unique_photos))
+        finally:
+            await aclient.close()
+            await openai_http.aclose()
+        
+        return [results[unique_index[(photo['image_url'], photo.get('caption', ''))]] for photo in photos]
     
     def analyze_profile_photos(self, photos: List[Dict], max_photos: int = 20) -> Dict:
         """
         Analyze multiple photos and create a profile summary
         
+        Runs its own event loop for the downloads and vision requests, so call it from a
+        worker thread (e.g. asyncio.to_thread) when inside async code.
+        
         Args:
             photos: List of photo dictionaries from parse_instagram_photos_file
             max_photos: Maximum number of photos to analyze
@@ -228,26 +531,11 @@ Be concise but insightful. Focus on what this photo reveals about the person's i
         analyses = []
         successful = 0
         
-        for i, photo in enumerate(photos[:max_photos], 1):
-            if self.debug:
-                print(f"\n  Processing photo {i}/{min(len(photos), max_photos)}...")
-            
-            # Download image
-            image_bytes = self.download_image(photo['image_url'])
-            if not image_bytes:
-                continue
-            
-            # Convert to base64
-            base64_image = self.image_to_base64(image_bytes, max_size=1024)
-            if not base64_image:
-                continue
-            
-            # Analyze
-            analysis = self.analyze_image(
-                base64_image,
-                caption=photo.get('caption', '')
-            )
-            
+        # Downloads and vision requests run concurrently; results come back in photo order
+        photos = photos[:max_photos]
+        results = asyncio.run(self._analyze_photos_async(photos))
+        
+        for i, (photo, analysis) in enumerate(zip(photos, results), 1):
             if analysis:
                 analyses.append({
                     'photo_number': i,
@@ -259,7 +547,7 @@ Be concise but insightful. Focus on what this photo reveals about the person's i
                 successful += 1
                 
                 if self.debug:
-                    print(f"    ✓ Analyzed successfully")
+                    print(f"  ✓ Analyzed photo {i}/{len(photos)}")
         
         if self.debug:
             print(f"\n✓ Successfully analyzed {successful}/{min(len(photos), max_photos)} photos")
@@ -286,13 +574,20 @@ Be concise but insightful. Focus on what this photo reveals about the person's i
         if not analyses:
             return "No photos were successfully analyzed."
         
-        # Combine all analyses into a prompt
-        combined_analyses = "\n\n".join([
-            f"Photo {a['photo_number']} ({a.get('timestamp', 'unknown date')}):\n"
-            f"Caption: {a.get('caption', 'No caption')}\n"
-            f"Analysis: {a['analysis']}"
-            for a in analyses
-        ])
+        # Combine all analyses into a prompt (each trimmed to keep the input tokens down)
+        buffer = io.StringIO()
+        for n, a in enumerate(analyses):
+            if n:
+                buffer.write("\n\n")
+            buffer.write("Photo ")
+            buffer.write(str(a['photo_number']))
+            buffer.write(" (")
+            buffer.write(a.get('timestamp', 'unknown date'))
+            buffer.write("):\nCaption: ")
+            buffer.write(a.get('caption', 'No caption'))
+            buffer.write("\nAnalysis: ")
+            buffer.write(a['analysis'][:SUMMARY_ANALYSIS_CHARS])
+        combined_analyses = buffer.getvalue()
         
         prompt = f"""Based on the following analyses of Instagram photos, create a comprehensive profile summary of this person.
 
@@ -309,19 +604,33 @@ Please provide:
 
 Be insightful and specific, drawing connections between different photos."""
         
+        # Same set of analyses as a recent run: reuse its summary
+        cache_key = hashlib.blake2b(prompt.encode('utf-8'), digest_size=16).digest()
+        with _summary_cache_lock:
+            cached = _summary_cache.get(cache_key)
+            if cached is not None:
+                _summary_cache.move_to_end(cache_key)
+                return cached
+        
         try:
             response = self.client.chat.completions.create(
-                model="gpt-4o",
+                model=VISION_MODEL,
                 messages=[
                     {
                         "role": "user",
                         "content": prompt
                     }
                 ],
+                response_format={"type": "text"},
                 max_tokens=500
             )
             
-            return response.choices[0].message.content
+            summary = response.choices[0].message.content
+            with _summary_cache_lock:
+                _summary_cache[cache_key] = summary
+                if len(_summary_cache) > SUMMARY_CACHE_SIZE:
+                    _summary_cache.popitem(last=False)
+            return summary
             
         except Exception as e:
             if self.debug:
@@ -1,6 +1,9 @@
 import os
 import sys
 import json
+import threading
+import numpy as np
+from collections import OrderedDict
 from typing import List, Dict, Optional
 from dotenv import load_dotenv
 
@@ -14,16 +17,28 @@ try:
 except ImportError:
     OPENAI_AVAILABLE = False
 
+# Context is budgeted in real tokens when tiktoken is available (characters otherwise)
+try:
+    import tiktoken
+    TIKTOKEN_AVAILABLE = True
+except ImportError:
+    TIKTOKEN_AVAILABLE = False
+
 # Import EmbeddingStore from create_embeddings
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
-from create_embeddings import EmbeddingStore
+from create_embeddings import EmbeddingStore, saved_metadata_path
+
+# Recent (query, top_k) -> search results, so repeated questions skip the embedding request
+# and FAISS search
+SEARCH_CACHE_SIZE = 512
 
 
 class PerspectiveGenerator:
     def __init__(self, embedding_model: str = "text-embedding-3-small", 
                  llm_model: str = "gpt-4o-mini", 
                  dimension: int = 1536,
-                 debug: bool = False):
+                 debug: bool = False,
+                 store: Optional[EmbeddingStore] = None):
         """
         Initialize perspective generator with vector store and LLM
         
@@ -32,6 +47,7 @@ class PerspectiveGenerator:
             llm_model: LLM model for generating perspectives
             dimension: Dimension of embeddings
             debug: Print debug information
+            store: Existing EmbeddingStore to share (a new one is created if omitted)
         """
         self.debug = debug
         self.llm_model = llm_model
@@ -48,9 +64,14 @@ class PerspectiveGenerator:
             )
         
         self.client = OpenAI(api_key=api_key)
-        self.store = EmbeddingStore(embedding_model=embedding_model, 
-                                   dimension=dimension, 
-                                   debug=debug)
+        self.store = store or EmbeddingStore(embedding_model=embedding_model, 
+                                            dimension=dimension, 
+                                            debug=debug)
+        
+        self._search_cache = OrderedDict()
+        self._search_cache_lock = threading.Lock()
+        # Tokenizer for the LLM, loaded on first use
+        self._encoding = None
         
         if debug:
             print(f"✓ PerspectiveGenerator initialized with LLM: {llm_model}")
@@ -69,21 +90,115 @@ class PerspectiveGenerator:
             print(f"  Metadata: {metadata_path}")
         
         self.store.load(index_path, metadata_path)
+        self.clear_search_cache()
         
         if self.debug:
             print(f"  ✓ Vector store loaded with {self.store.index.ntotal} vectors")
     
+    def clear_search_cache(self):
+        """Drop cached search results (called when the vector store is reloaded)"""
+        with self._search_cache_lock:
+            self._search_cache.clear()
+    
+    def _search_key(self, query: str, top_k: int) -> tuple:
+        # The index identity and size are part of the key, so results cached before the store
+        # was reloaded or grew are never served
+        return (query.strip().lower(), top_k, id(self.store.index), self.store.index.ntotal)
+    
+    def _cache_search_results(self, key: tuple, results: List):
+        with self._search_cache_lock:
+            self._search_cache[key] = results
+            if len(self._search_cache) > SEARCH_CACHE_SIZE:
+                self._search_cache.popitem(last=False)
+    
+    def _search(self, query: str, top_k: int) -> List:
+        """store.search with an LRU of recent results, keyed on the normalized query"""
+        key = self._search_key(query, top_k)
+        with self._search_cache_lock:
+            results = self._search_cache.get(key)
+            if results is not None:
+                self._search_cache.move_to_end(key)
+                if self.debug:
+                    print(f"  ✓ Using cached search results")
+                return results
+        
+        results = self.store.search(query, k=top_k)
+        self._cache_search_results(key, results)
+        return results
+    
+    def prefetch_searches(self, queries: List[str], top_k: int = 5):
+        """
+        Search for several queries with one embedding request and one FAISS search
+        
+        Results go into the search cache, so the following search_and_generate_perspective
+        calls for these queries don't embed or search again.
+        
+        Args:
+            queries: Questions that will be asked next
+            top_k: Number of relevant documents to retrieve per query
+        """
+        keys = {}
+        for query in queries:
+            key = self._search_key(query, top_k)
+            with self._search_cache_lock:
+                if key in self._search_cache:
+                    continue
+            keys.setdefault(key, query)
+        
+        if not keys:
+            return
+        
+        if self.debug:
+            print(f"Prefetching search results for {len(keys)} queries...")
+        
+        for key, results in zip(keys, self.store.search_batch(list(keys.values()), k=top_k)):
+            self._cache_search_results(key, results)
+    
+    def _get_encoding(self):
+        """tiktoken encoding for the LLM (o200k_base for models tiktoken doesn't know)"""
+        if self._encoding is None:
+            try:
+                self._encoding = tiktoken.encoding_for_model(self.llm_model)
+            except KeyError:
+                self._encoding = tiktoken.get_encoding("o200k_base")
+        return self._encoding
+    
+    def _build_context_tokens(self, source_texts: List[str], max_tokens: int) -> List[str]:
+        """Keep whole sources until max_tokens is reached, then cut the last one at a token boundary"""
+        encoding = self._get_encoding()
+        ellipsis_tokens = len(encoding.encode("...\n"))
+        
+        context_parts = []
+        total_tokens = 0
+        for source_text in source_texts:
+            tokens = encoding.encode(source_text)
+            
+            if total_tokens + len(tokens) > max_tokens:
+                # Truncate if needed
+                remaining = max_tokens - total_tokens - ellipsis_tokens
+                if remaining > 0:
+                    context_parts.append(encoding.decode(tokens[:remaining]) + "...\n")
+                break
+            
+            context_parts.append(source_text)
+            total_tokens += len(tokens)
+        
+        return context_parts
+    
     def search_and_generate_perspective(self, query: str, top_k: int = 5, 
                                        max_context_length: int = 2000,
-                                       persona_prompt: Optional[str] = None) -> Dict:
+                                       persona_prompt: Optional[str] = None,
+                                       max_context_tokens: Optional[int] = None) -> Dict:
         """
         Search vector store and generate a perspective based on retrieved context
         
         Args:
             query: User's question or query
             top_k: Number of relevant documents to retrieve
-            max_context_length: Maximum characters of context to include
+            max_context_length: Maximum characters of context to include (without tiktoken)
             persona_prompt: Optional persona prompt to prepend to system message (e.g., "You're a creative entrepreneur...")
+            max_context_tokens: Maximum tokens of context to include when tiktoken is installed
+                                (defaults to max_context_length // 4, about the same budget)
             
         Returns:
             Dictionary with 'perspective', 'sources', and 'query'
@@ -97,7 +212,7 @@ class PerspectiveGenerator:
         if self.debug:
             print(f"\nStep 1: Searching vector store...")
         
-        results = self.store.search(query, k=top_k)
+        results = self._search(query, top_k)
         
         if not results:
             return {
@@ -115,24 +230,32 @@ class PerspectiveGenerator:
                 print(f"    Distance: {result['distance']:.4f}")
         
         # Step 2: Build context from retrieved documents
-        context_parts = []
-        total_length = 0
+        source_texts = [
+            f"Source {i} (Category: {result['category']}):\n"
+            f"Summary: {result['summary']}\n"
+            f"Content: {result['text']}\n"
+            for i, result in enumerate(results, 1)
+        ]
         
-        for i, result in enumerate(results, 1):
-            source_text = f"Source {i} (Category: {result['category']}):\n"
-            source_text += f"Summary: {result['summary']}\n"
-            source_text += f"Content: {result['text']}\n"
-            
-            if total_length + len(source_text) > max_context_length:
-                # Truncate if needed
-                remaining = max_context_length - total_length - len("...\n")
-                if remaining > 0:
-                    source_text = source_text[:remaining] + "...\n"
-                    context_parts.append(source_text)
-                break
+        if TIKTOKEN_AVAILABLE:
+            context_parts = self._build_context_tokens(
+                source_texts, max_context_tokens or max_context_length // 4
+            )
+        else:
+            context_parts = []
+            total_length = 0
             
-            context_parts.append(source_text)
-            total_length += len(source_text)
+            for source_text in source_texts:
+                if total_length + len(source_text) > max_context_length:
+                    # Truncate if needed
+                    remaining = max_context_length - total_length - len("...\n")
+                    if remaining > 0:
+                        source_text = source_text[:remaining] + "...\n"
+                        context_parts.append(source_text)
+                    break
+                
+                context_parts.append(source_text)
+                total_length += len(source_text)
         
         context = "\n".join(context_parts)
         
@@ -196,15 +319,17 @@ Provide your perspective:"""
             if self.debug:
                 print(f"  ✓ Generated perspective ({len(perspective)} characters)")
             
-            # Prepare sources for output
+            # Prepare sources for output (relevance 1 / (1 + distance), 1.0 for exact matches)
+            distances = np.fromiter((r['distance'] for r in results), dtype=np.float64, count=len(results))
+            scores = np.divide(1.0, 1.0 + distances, out=np.ones_like(distances), where=distances > 0)
             sources = [
                 {
                     'rank': r['rank'],
                     'category': r['category'],
                     'summary': r['summary'],
-                    'relevance_score': round(1.0 / (1.0 + r['distance']), 4) if r['distance'] > 0 else 1.0
+                    'relevance_score': score
                 }
-                for r in results
+                for r, score in zip(results, np.round(scores, 4).tolist())
             ]
             
             return {
@@ -279,7 +404,7 @@ def find_vector_store_files(data_dir: str) -> tuple:
     index_path = os.path.join(data_dir, "embeddings.index")
     metadata_path = os.path.join(data_dir, "embeddings_metadata.json")
     
-    if os.path.exists(index_path) and os.path.exists(metadata_path):
+    if os.path.exists(index_path) and saved_metadata_path(metadata_path):
         return index_path, metadata_path
     
     return None, None
@@ -304,6 +429,10 @@ Examples:
   # Single query
   python src/perspective.py --query "What are the latest trends in AI?"
   
+  # Several queries (searched with one batched embedding request)
+  python src/perspective.py -q "First question" -q "Second question"
+  python src/perspective.py --queries-file questions.txt
+  
   # Custom vector store location
   python src/perspective.py --query "Your question" --index data/custom.index --metadata data/custom_metadata.json
         """
@@ -312,7 +441,14 @@ Examples:
     parser.add_argument(
         '--query', '-q',
         type=str,
-        help='Question or query to process (if not provided, runs in interactive mode)'
+        action='append',
+        help='Question or query to process; repeat for several (if not provided, runs in interactive mode)'
+    )
+    parser.add_argument(
+        '--queries-file',
+        type=str,
+        default=None,
+        help='File with one question per line to process in batch'
     )
     parser.add_argument(
         '--index',
@@ -370,11 +506,19 @@ Examples:
         generator = PerspectiveGenerator(llm_model=args.model, debug=args.debug)
         generator.load_vector_store(index_path, metadata_path)
         
+        queries = list(args.query or [])
+        if args.queries_file:
+            with open(args.queries_file, 'r', encoding='utf-8') as f:
+                queries.extend(line.strip() for line in f if line.strip())
+        
         # Process query
-        if args.query:
-            # Single query mode
-            result = generator.search_and_generate_perspective(args.query, top_k=args.top_k)
-            print("\n" + generator.format_output(result))
+        if queries:
+            # Single/batch query mode: embed and search all queries at once up front
+            if len(queries) > 1:
+                generator.prefetch_searches(queries, top_k=args.top_k)
+            for query in queries:
+                result = generator.search_and_generate_perspective(query, top_k=args.top_k)
+                print("\n" + generator.format_output(result))
         else:
             # Interactive mode
             print("\nEntering interactive mode. Type 'quit' or 'exit' to stop.\n")
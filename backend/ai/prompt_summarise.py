@@ -1,65 +1,443 @@
 import os
-from typing import Optional, List
+import asyncio
+import hashlib
+import logging
+import random
+import sqlite3
+import sys
+import threading
+import time
+from typing import Optional, List, Dict, Tuple, Union, AsyncIterator
+import httpx
+import numpy as np
+import orjson
 from dotenv import load_dotenv
-from openai import OpenAI
+from openai import (OpenAI, AsyncOpenAI, RateLimitError, APIConnectionError, APITimeoutError,
+                    InternalServerError)
 
-load_dotenv(dotenv_path='.env')
+# Progress and error messages are logged at DEBUG (formatted only when enabled);
+# PromptSummarizer(debug=True) shows them on stdout
+logger = logging.getLogger(__name__)
+
+# On-disk cache of generated prompts (SQLite, keyed by a hash of method + model + messages);
+# pass cache_path=None to disable
+DEFAULT_CACHE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                  "data", "prompt_cache.sqlite")
+# On an exact miss, a cached prompt is reused when the character summary's embedding is at least
+# this similar to one cached for the same method/person; pass semantic_threshold=None to disable
+SEMANTIC_CACHE_THRESHOLD = 0.97
+# Embedding model for the semantic cache tier and for comparing candidate image prompts
+EMBEDDING_MODEL = "text-embedding-3-small"
+
+# Multi-prompt requests generate this many extra candidates, then drop any whose embedding is
+# at least PROMPT_DEDUPE_THRESHOLD similar to one already kept
+PROMPT_OVERSAMPLE = 2
+PROMPT_DEDUPE_THRESHOLD = 0.92
+
+CachedPrompt = Union[str, List[str]]
+
+# Concurrent async completions per summarizer (OPENAI_MAX_CONCURRENT overrides; share one summarizer
+# between concurrent callers for the cap to hold across them); transiently failing
+# requests are retried with jittered exponential backoff (1s, 2s, 4s, 8s; capped at 30s)
+DEFAULT_MAX_CONCURRENT = 10
+REQUEST_RETRIES = 4
+REQUEST_BACKOFF = 1.0
+REQUEST_BACKOFF_CAP = 30.0
+# Batch API jobs (half price, separate rate limits, results within the completion window) for
+# offline runs over many summaries; collect_batch polls the job at this interval
+BATCH_COMPLETION_WINDOW = "24h"
+BATCH_POLL_INTERVAL = 30.0
+
+# Transient failures worth retrying; auth and bad-request errors fail immediately
+RETRYABLE_ERRORS = (RateLimitError, APIConnectionError, APITimeoutError, InternalServerError)
+
+# Clients shared by every PromptSummarizer not given its own, created on first use so
+# summarizers built per request reuse one connection pool
+_client: Optional[OpenAI] = None
+_aclient: Optional[AsyncOpenAI] = None
+_client_lock = threading.Lock()
+
+# Fixed system prompts, kept byte-identical across calls so the provider can reuse its cache
+# of the shared prompt prefix; only the user message varies
+IMAGE_SYSTEM_PROMPT = """You are a prompt engineer for image generation. Your task is to convert character summaries into concise, vivid two-sentence prompts that describe how to visualize a person in an image.
+
+The prompt should:
+1. Start with "Make an image of [person]..." or "Create an image of [person]..."
+2. Describe the person's appearance, personality, and key characteristics
+3. Include their interests, lifestyle, or activities
+4. Be specific and visual, suitable for image generation models
+5. Be exactly two sentences
+6. Focus on visual elements that can be represented in an image
+
+Example format:
+"Make an image of a person who is an innovative tech entrepreneur, adventurous traveler, and cultural enthusiast. The person should appear social and outgoing, surrounded by elements that represent innovation and collaboration, with a modern and dynamic aesthetic."
+"""
+
+TEXT_SYSTEM_PROMPT = """You are a prompt engineer for LLM persona creation. Your task is to convert character summaries into a concise, single-sentence persona prompt that describes who the person is.
+
+The prompt should:
+1. Start with "You're" or "You are"
+2. Be exactly ONE sentence
+3. Capture the person's key characteristics, profession, interests, or personality traits
+4. Be natural and conversational
+5. Be suitable for giving an LLM a persona to adopt
+
+Example format:
+"You're a creative entrepreneur who loves hardware and building innovative technology products."
+"""
+
+# Sentence-ending punctuation (persona prompts are cut to their first sentence)
+_SENTENCE_ENDS = '.!?'
+# Whitespace and wrapping quotes trimmed from image prompts in a single strip() pass
+_PROMPT_STRIP_CHARS = ' \t\r\n"\''
+
+
+def _get_api_key() -> str:
+    api_key = os.getenv('OPENAI_API_KEY')
+    if not api_key:
+        raise ValueError("OPENAI_API_KEY required in .env file")
+    return api_key
+
+
+def _get_client() -> OpenAI:
+    """Return the module-level sync OpenAI client, creating it on first use"""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = OpenAI(api_key=_get_api_key())
+        return _client
+
+
+def _get_async_client() -> AsyncOpenAI:
+    """Return the module-level AsyncOpenAI client on an HTTP/2 pool, creating it on first use"""
+    global _aclient
+    with _client_lock:
+        if _aclient is None or _aclient.is_closed():
+            # Concurrent completions multiplex over one HTTP/2 connection instead of
+            # paying a TCP+TLS handshake each
+            _aclient = AsyncOpenAI(
+                api_key=_get_api_key(),
+                http_client=httpx.AsyncClient(
+                    http2=True,
+                    limits=httpx.Limits(max_connections=100, max_keepalive_connections=50),
+                    timeout=httpx.Timeout(60.0, connect=10.0),
+                ),
+            )
+        return _aclient
+
+
+async def close_shared_async_client():
+    """Close the module-level AsyncOpenAI client and its connection pool, if one was created"""
+    global _aclient
+    if _aclient is not None:
+        await _aclient.close()
+        _aclient = None
+
+
+def _retry_delay(attempt: int) -> float:
+    """Jittered exponential backoff before retry number attempt + 1"""
+    return min(REQUEST_BACKOFF * 2 ** attempt + random.random(), REQUEST_BACKOFF_CAP)
+
+
+def _enable_debug_logging():
+    """Print this module's debug messages to stdout, as the debug flag did with print()"""
+    if not logger.handlers:
+        handler = logging.StreamHandler(sys.stdout)
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        logger.addHandler(handler)
+    logger.setLevel(logging.DEBUG)
+
+
+def _sentence_end(text: str) -> int:
+    """Index of the first sentence-ending character in text, or len(text) if there is none"""
+    return min((i for i in map(text.find, _SENTENCE_ENDS) if i >= 0), default=len(text))
 
 
 class PromptSummarizer:
-    def __init__(self, debug: bool = False, model: str = "gpt-4o-mini"):
+    def __init__(self, debug: bool = False, model: str = "gpt-4o-mini",
+                 aclient: Optional[AsyncOpenAI] = None,
+                 cache_path: Optional[str] = DEFAULT_CACHE_PATH,
+                 semantic_threshold: Optional[float] = SEMANTIC_CACHE_THRESHOLD,
+                 max_concurrent: Optional[int] = None):
         """
         Initialize prompt summarizer for converting character summaries to image generation prompts
         
         Args:
-            debug: Print debug information
+            debug: Print debug information (enables this module's DEBUG logging on stdout)
             model: OpenAI model to use (default: "gpt-4o-mini")
+            aclient: Shared AsyncOpenAI client for the async methods (default: the module-level
+                     one on an HTTP/2 connection pool, see close_shared_async_client())
+            cache_path: SQLite file caching generated prompts across runs (None disables it)
+            semantic_threshold: Cosine similarity above which a cached prompt for a similar
+                                summary is reused (None disables the embedding lookup)
+            max_concurrent: Cap on in-flight async completions (default: OPENAI_MAX_CONCURRENT or 10)
         """
         self.debug = debug
         self.model = model
-        self.client = None
+        if debug:
+            _enable_debug_logging()
         
-        # Initialize OpenAI client
-        api_key = os.getenv('OPENAI_API_KEY')
-        if not api_key:
-            raise ValueError("OPENAI_API_KEY required in .env file")
+        # Initialize OpenAI clients (shared across summarizers)
+        self.client = _get_client()
+        self.aclient = aclient or _get_async_client()
+        self._semaphore = asyncio.Semaphore(
+            max_concurrent or int(os.getenv('OPENAI_MAX_CONCURRENT', DEFAULT_MAX_CONCURRENT))
+        )
         
-        self.client = OpenAI(api_key=api_key)
+        # Prompts for summaries seen before (or close enough) are reused instead of re-asking the model
+        self.semantic_threshold = semantic_threshold
+        self._cache = self._open_cache(cache_path) if cache_path else None
+        self._cache_lock = threading.Lock()
         
-        if debug:
-            print("✓ PromptSummarizer initialized with OpenAI API")
+        logger.debug("✓ PromptSummarizer initialized with OpenAI API")
     
-    def create_image_prompt(self, character_summary: str, person_name: Optional[str] = None) -> Optional[str]:
+    def _open_cache(self, cache_path: str) -> Optional[sqlite3.Connection]:
+        """Open (or create) the SQLite prompt cache; returns None if it can't be opened"""
+        try:
+            os.makedirs(os.path.dirname(cache_path), exist_ok=True) if os.path.dirname(cache_path) else None
+            conn = sqlite3.connect(cache_path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("CREATE TABLE IF NOT EXISTS prompts "
+                         "(key BLOB PRIMARY KEY, scope BLOB, value TEXT, embedding BLOB)")
+            conn.execute("CREATE INDEX IF NOT EXISTS prompts_scope ON prompts (scope)")
+            conn.commit()
+            return conn
+        except Exception as e:
+            logger.warning("  ⚠ Prompt cache disabled: %s", e)
+            return None
+    
+    def _cache_keys(self, method: str, messages: List[Dict[str, str]], person_name: Optional[str],
+                    num_prompts: int = 1) -> Tuple[bytes, Optional[bytes]]:
         """
-        Convert a character summary into a two-sentence prompt for image generation
+        Exact key (hash of method, model and full messages) and semantic scope (everything that
+        must match besides the character summary for a similar summary's prompt to be reusable).
+        Without a person_name there is no scope: unnamed summaries may belong to anyone, so only
+        exact hits are reused for them
+        """
+        head = f"{method}\0{self.model}\0{num_prompts}\0".encode('utf-8')
+        key = hashlib.blake2b(head + orjson.dumps(messages), digest_size=16).digest()
+        if not person_name:
+            return key, None
+        scope = hashlib.blake2b(head + person_name.encode('utf-8'), digest_size=16).digest()
+        return key, scope
+    
+    def _cache_get(self, key: bytes) -> Optional[CachedPrompt]:
+        if self._cache is None:
+            return None
+        with self._cache_lock:
+            row = self._cache.execute("SELECT value FROM prompts WHERE key = ?", (key,)).fetchone()
+        return orjson.loads(row[0]) if row else None
+    
+    def _cache_get_similar(self, scope: Optional[bytes], embedding: Optional[np.ndarray]) -> Optional[CachedPrompt]:
+        """Cached value whose summary embedding is most similar to embedding, if above the threshold"""
+        if self._cache is None or scope is None or embedding is None:
+            return None
+        with self._cache_lock:
+            rows = self._cache.execute(
+                "SELECT value, embedding FROM prompts WHERE scope = ? AND embedding IS NOT NULL", (scope,)
+            ).fetchall()
+        if not rows:
+            return None
+        # Stored embeddings are unit length, so the dot product is the cosine similarity
+        similarities = np.stack([np.frombuffer(row[1], dtype=np.float32) for row in rows]) @ embedding
+        best = int(np.argmax(similarities))
+        if similarities[best] < self.semantic_threshold:
+            return None
+        logger.debug("  ✓ Reusing cached prompt for a similar summary (similarity %.3f)", similarities[best])
+        return orjson.loads(rows[best][0])
+    
+    def _cache_put(self, key: bytes, scope: Optional[bytes], value: CachedPrompt, embedding: Optional[np.ndarray]):
+        if self._cache is None:
+            return
+        with self._cache_lock:
+            self._cache.execute(
+                "INSERT OR REPLACE INTO prompts (key, scope, value, embedding) VALUES (?, ?, ?, ?)",
+                (key, scope, orjson.dumps(value).decode('utf-8'),
+                 embedding.tobytes() if embedding is not None else None)
+            )
+            self._cache.commit()
+    
+    def _normalize_embedding(self, response) -> np.ndarray:
+        embedding = np.asarray(response.data[0].embedding, dtype=np.float32)
+        return embedding / (np.linalg.norm(embedding) or 1.0)
+    
+    def _select_distinct(self, prompts: List[str], response, num_prompts: int) -> List[str]:
+        """
+        Greedily keep prompts (in order) whose embedding is below PROMPT_DEDUPE_THRESHOLD
+        similarity to every prompt already kept, up to num_prompts
         
         Args:
-            character_summary: Text summary describing the person's personality, interests, lifestyle, etc.
-            person_name: Optional name of the person (if provided, will be used in the prompt)
-            
-        Returns:
-            Two-sentence prompt string for image generation, or None on error
+            prompts: Candidate prompts (exact duplicates already removed)
+            response: Embeddings response for the candidates, or None to skip the comparison
+            num_prompts: Number of prompts wanted
         """
-        if not character_summary or not character_summary.strip():
-            if self.debug:
-                print("  ✗ Empty character summary provided")
+        if response is None or len(response.data) != len(prompts):
+            return prompts[:num_prompts]
+        vectors = np.asarray([item.embedding for item in response.data], dtype=np.float32)
+        vectors /= np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+        similarities = vectors @ vectors.T
+        kept = []
+        for i in range(len(prompts)):
+            if not kept or similarities[i, kept].max() < PROMPT_DEDUPE_THRESHOLD:
+                kept.append(i)
+                if len(kept) == num_prompts:
+                    break
+            else:
+                logger.debug("  ⚠ Dropped near-duplicate prompt: %.60s...", prompts[i])
+        return [prompts[i] for i in kept]
+    
+    def _dedupe_prompts(self, prompts: List[str], num_prompts: int) -> List[str]:
+        """Drop near-duplicate candidate prompts using one embeddings request"""
+        response = None
+        if len(prompts) > 1:
+            try:
+                response = self.client.embeddings.create(model=EMBEDDING_MODEL, input=prompts)
+            except Exception as e:
+                logger.debug("  ⚠ Could not embed prompts for deduplication: %s", e)
+        return self._select_distinct(prompts, response, num_prompts)
+    
+    async def _adedupe_prompts(self, prompts: List[str], num_prompts: int) -> List[str]:
+        """Async _dedupe_prompts"""
+        response = None
+        if len(prompts) > 1:
+            try:
+                response = await self.aclient.embeddings.create(model=EMBEDDING_MODEL, input=prompts)
+            except Exception as e:
+                logger.debug("  ⚠ Could not embed prompts for deduplication: %s", e)
+        return self._select_distinct(prompts, response, num_prompts)
+    
+    def _embed_summary(self, character_summary: str) -> Optional[np.ndarray]:
+        """Unit-length embedding of a character summary for the semantic cache tier (None if disabled)"""
+        if self._cache is None or self.semantic_threshold is None:
             return None
+        try:
+            response = self.client.embeddings.create(model=EMBEDDING_MODEL, input=character_summary.strip())
+            return self._normalize_embedding(response)
+        except Exception as e:
+            logger.debug("  ⚠ Could not embed summary for the prompt cache: %s", e)
+            return None
+    
+    async def _aembed_summary(self, character_summary: str) -> Optional[np.ndarray]:
+        """Async _embed_summary"""
+        if self._cache is None or self.semantic_threshold is None:
+            return None
+        try:
+            response = await self.aclient.embeddings.create(model=EMBEDDING_MODEL,
+                                                            input=character_summary.strip())
+            return self._normalize_embedding(response)
+        except Exception as e:
+            logger.debug("  ⚠ Could not embed summary for the prompt cache: %s", e)
+            return None
+    
+    def _cache_lookup(self, key: bytes, scope: Optional[bytes],
+                      character_summary: str) -> Tuple[Optional[CachedPrompt], Optional[np.ndarray]]:
+        """
+        Exact then semantic cache lookup (the semantic tier only runs with a scope)
         
-        # Build the prompt for OpenAI
-        system_prompt = """You are a prompt engineer for image generation. Your task is to convert character summaries into concise, vivid two-sentence prompts that describe how to visualize a person in an image.
-
-The prompt should:
-1. Start with "Make an image of [person]..." or "Create an image of [person]..."
-2. Describe the person's appearance, personality, and key characteristics
-3. Include their interests, lifestyle, or activities
-4. Be specific and visual, suitable for image generation models
-5. Be exactly two sentences
-6. Focus on visual elements that can be represented in an image
-
-Example format:
-"Make an image of a person who is an innovative tech entrepreneur, adventurous traveler, and cultural enthusiast. The person should appear social and outgoing, surrounded by elements that represent innovation and collaboration, with a modern and dynamic aesthetic."
-"""
+        Returns:
+            (cached value or None, summary embedding to store with a fresh result)
+        """
+        cached = self._cache_get(key)
+        if cached is not None:
+            logger.debug("  ✓ Using cached prompt")
+            return cached, None
+        if scope is None:
+            return None, None
+        embedding = self._embed_summary(character_summary)
+        cached = self._cache_get_similar(scope, embedding)
+        if cached is not None:
+            self._cache_put(key, scope, cached, embedding)
+        return cached, embedding
+    
+    async def _acache_lookup(self, key: bytes, scope: Optional[bytes], character_summary: str,
+                             embedding: Optional[np.ndarray] = None
+                             ) -> Tuple[Optional[CachedPrompt], Optional[np.ndarray]]:
+        """Async _cache_lookup (embedding: the summary's embedding, if the caller already has it)"""
+        cached = self._cache_get(key)
+        if cached is not None:
+            logger.debug("  ✓ Using cached prompt")
+            return cached, None
+        if scope is None:
+            return None, None
+        if embedding is None:
+            embedding = await self._aembed_summary(character_summary)
+        cached = self._cache_get_similar(scope, embedding)
+        if cached is not None:
+            self._cache_put(key, scope, cached, embedding)
+        return cached, embedding
+    
+    async def awarmup(self) -> Optional[Dict[str, str]]:
+        """
+        Open the async client's connection with a 1-token completion so the first real request
+        doesn't pay DNS + TCP + TLS + HTTP/2 setup, reading the account's limits for this model
+        from the response headers
         
+        Returns:
+            Dict of rate-limit headers (e.g. "x-ratelimit-limit-requests",
+            "x-ratelimit-limit-tokens"), or None if the probe failed
+        """
+        try:
+            raw = await self.aclient.chat.completions.with_raw_response.create(
+                model=self.model,
+                messages=[{"role": "user", "content": "ping"}],
+                max_tokens=1
+            )
+        except Exception as e:
+            logger.debug("  ⚠ OpenAI warmup probe failed: %s", e)
+            return None
+        limits = {name: value for name, value in raw.headers.items() if name.startswith("x-ratelimit-limit-")}
+        logger.debug("✓ OpenAI connection warmed up (%s, limits: %s)", raw.http_request.url.host, limits)
+        return limits
+    
+    def _create(self, messages: List[Dict[str, str]], **kwargs):
+        """Chat completion with this summarizer's model, retried on transient errors"""
+        for attempt in range(REQUEST_RETRIES + 1):
+            try:
+                return self.client.chat.completions.create(model=self.model, messages=messages, **kwargs)
+            except RETRYABLE_ERRORS as e:
+                if attempt == REQUEST_RETRIES:
+                    raise
+                delay = _retry_delay(attempt)
+                logger.debug("  ⚠ %s, retrying in %.1fs...", type(e).__name__, delay)
+                time.sleep(delay)
+    
+    async def _acreate(self, messages: List[Dict[str, str]], **kwargs):
+        """Async chat completion with this summarizer's model, bounded and retried on transient errors"""
+        async with self._semaphore:
+            for attempt in range(REQUEST_RETRIES + 1):
+                try:
+                    return await self.aclient.chat.completions.create(model=self.model, messages=messages, **kwargs)
+                except RETRYABLE_ERRORS as e:
+                    if attempt == REQUEST_RETRIES:
+                        raise
+                    delay = _retry_delay(attempt)
+                    logger.debug("  ⚠ %s, retrying in %.1fs...", type(e).__name__, delay)
+                    await asyncio.sleep(delay)
+    
+    async def _astream(self, messages: List[Dict[str, str]], **kwargs) -> AsyncIterator[str]:
+        """Stream a chat completion's content deltas (bounded like _acreate; opening it is retried)"""
+        async with self._semaphore:
+            for attempt in range(REQUEST_RETRIES + 1):
+                try:
+                    stream = await self.aclient.chat.completions.create(
+                        model=self.model, messages=messages, stream=True, **kwargs
+                    )
+                    break
+                except RETRYABLE_ERRORS:
+                    if attempt == REQUEST_RETRIES:
+                        raise
+                    await asyncio.sleep(_retry_delay(attempt))
+            try:
+                async for chunk in stream:
+                    delta = chunk.choices[0].delta.content if chunk.choices else None
+                    if delta:
+                        yield delta
+            finally:
+                await stream.close()
+    
+    def _image_prompt_messages(self, character_summary: str, person_name: Optional[str] = None,
+                               variation: str = "") -> List[Dict[str, str]]:
+        """Chat messages asking for one two-sentence image prompt (variation is appended to the request)"""
         user_prompt = f"""Convert the following character summary into a two-sentence image generation prompt:
 
 Character Summary:
@@ -67,38 +445,58 @@ Character Summary:
 
 {f"Person's name: {person_name}" if person_name else ""}
 
-Generate a two-sentence prompt that starts with "Make an image of {person_name if person_name else 'this person'}" and describes how to visualize them based on the summary."""
+Generate a two-sentence prompt that starts with "Make an image of {person_name if person_name else 'this person'}" and describes how to visualize them based on the summary.{variation}"""
+        
+        return [
+            {
+                "role": "system",
+                "content": IMAGE_SYSTEM_PROMPT
+            },
+            {
+                "role": "user",
+                "content": user_prompt
+            }
+        ]
+    
+    def create_image_prompt(self, character_summary: str, person_name: Optional[str] = None) -> Optional[str]:
+        """
+        Convert a character summary into a two-sentence prompt for image generation
+        
+        Args:
+            character_summary: Text summary describing the person's personality, interests, lifestyle, etc.
+            person_name: Optional name of the person (if provided, will be used in the prompt)
+            
+        Returns:
+            Two-sentence prompt string for image generation, or None on error
+        """
+        if not character_summary or not character_summary.strip():
+            logger.debug("  ✗ Empty character summary provided")
+            return None
+        
+        messages = self._image_prompt_messages(character_summary, person_name)
+        key, scope = self._cache_keys("image_prompt", messages, person_name)
+        cached, embedding = self._cache_lookup(key, scope, character_summary)
+        if cached is not None:
+            return cached
         
         try:
-            if self.debug:
-                print(f"  Creating image prompt from character summary...")
+            logger.debug("  Creating image prompt from character summary...")
             
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": system_prompt
-                    },
-                    {
-                        "role": "user",
-                        "content": user_prompt
-                    }
-                ],
+            response = self._create(
+                messages,
                 temperature=0.7,
                 max_tokens=200
             )
             
             prompt = response.choices[0].message.content.strip()
+            self._cache_put(key, scope, prompt, embedding)
             
-            if self.debug:
-                print(f"  ✓ Generated prompt: {prompt[:100]}...")
+            logger.debug("  ✓ Generated prompt: %.100s...", prompt)
             
             return prompt
             
         except Exception as e:
-            if self.debug:
-                print(f"  ✗ Error creating image prompt: {e}")
+            logger.debug("  ✗ Error creating image prompt: %s", e)
             return None
     
     def create_multiple_image_prompts(
@@ -119,121 +517,80 @@ Generate a two-sentence prompt that starts with "Make an image of {person_name i
             List of different prompt strings, or None on error
         """
         if not character_summary or not character_summary.strip():
-            if self.debug:
-                print("  ✗ Empty character summary provided")
+            logger.debug("  ✗ Empty character summary provided")
             return None
         
-        # Build the prompt for OpenAI to generate multiple variations
-        system_prompt = """You are a prompt engineer for image generation. Your task is to convert character summaries into multiple distinct, vivid two-sentence prompts that describe different ways to visualize a person in images.
-
-Each prompt should:
-1. Start with "Make an image of [person]..." or "Create an image of [person]..."
-2. Describe the person's appearance, personality, and key characteristics
-3. Include their interests, lifestyle, or activities
-4. Be specific and visual, suitable for image generation models
-5. Be exactly two sentences
-6. Focus on visual elements that can be represented in an image
-7. Each prompt should emphasize DIFFERENT aspects or contexts to create variety
-
-Generate multiple prompts that explore different facets, settings, or moods while staying true to the character summary."""
-        
-        user_prompt = f"""Convert the following character summary into {num_prompts} DIFFERENT two-sentence image generation prompts. Each prompt should explore a different aspect, setting, mood, or context while staying true to the character.
-
-Character Summary:
-{character_summary.strip()}
-
-{f"Person's name: {person_name}" if person_name else ""}
-
-Generate {num_prompts} distinct prompts, each starting with "Make an image of {person_name if person_name else 'this person'}" but focusing on different visual interpretations, contexts, or aspects of their personality. Number each prompt (1, 2, 3, etc.)."""
+        messages = self._image_prompt_messages(character_summary, person_name)
+        # Keyed like the async variant so either path reuses the other's prompts
+        key, scope = self._cache_keys("image_prompts", messages, person_name, num_prompts)
+        cached, embedding = self._cache_lookup(key, scope, character_summary)
+        if cached is not None:
+            return cached
         
         try:
-            if self.debug:
-                print(f"  Creating {num_prompts} different image prompts from character summary...")
+            logger.debug("  Creating %s different image prompts from character summary...", num_prompts)
             
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": system_prompt
-                    },
-                    {
-                        "role": "user",
-                        "content": user_prompt
-                    }
-                ],
+            # n independent completions of the single-prompt request, so each choice is one
+            # clean prompt and the shared prompt is only sent (and billed) once; a few extra
+            # candidates cover the ones dropped as near-duplicates
+            response = self._create(
+                messages,
                 temperature=0.9,  # Higher temperature for more variety
-                max_tokens=600  # More tokens for multiple prompts
+                max_tokens=200,
+                n=num_prompts + PROMPT_OVERSAMPLE
             )
             
-            content = response.choices[0].message.content.strip()
-            
-            # Parse the response to extract individual prompts
-            # The prompts might be numbered or separated by newlines
             prompts = []
+            for choice in response.choices:
+                prompt = (choice.message.content or "").strip(_PROMPT_STRIP_CHARS)
+                if len(prompt) > 20 and prompt not in prompts:
+                    prompts.append(prompt)
+            prompts = self._dedupe_prompts(prompts, num_prompts)
             
-            # Try to split by numbered items (1., 2., 3., etc.)
-            import re
-            # Split by numbered patterns or double newlines
-            parts = re.split(r'\n\s*\d+[\.\)]\s*', content)
-            if len(parts) > 1:
-                # Remove the first part if it's just intro text
-                parts = [p.strip() for p in parts[1:] if p.strip()]
-            else:
-                # Try splitting by double newlines
-                parts = re.split(r'\n\n+', content)
-                parts = [p.strip() for p in parts if p.strip()]
-            
-            # Clean up each prompt
-            for part in parts:
-                # Remove numbering if present
-                cleaned = re.sub(r'^\d+[\.\)]\s*', '', part.strip())
-                # Remove quotes if present
-                cleaned = cleaned.strip('"\'')
-                if cleaned and len(cleaned) > 20:  # Ensure it's a substantial prompt
-                    prompts.append(cleaned)
-            
-            # If we didn't get enough prompts, try to split by sentences
-            if len(prompts) < num_prompts:
-                # Fallback: split the content into chunks
-                sentences = re.split(r'(?<=[.!?])\s+', content)
-                # Group sentences into pairs (two sentences per prompt)
-                for i in range(0, len(sentences), 2):
-                    if i + 1 < len(sentences):
-                        prompt = f"{sentences[i]} {sentences[i+1]}".strip()
-                        if prompt and len(prompt) > 20:
-                            prompts.append(prompt)
-            
-            # Limit to requested number
-            prompts = prompts[:num_prompts]
-            
-            # If we still don't have enough, use the original method multiple times
-            if len(prompts) < num_prompts:
-                if self.debug:
-                    print(f"  Warning: Only got {len(prompts)} prompts, generating additional ones...")
-                # Generate remaining prompts individually with slight variations
-                for i in range(len(prompts), num_prompts):
-                    variation_prompt = self.create_image_prompt(
-                        character_summary,
-                        person_name
-                    )
-                    if variation_prompt and variation_prompt not in prompts:
-                        prompts.append(variation_prompt)
+            if len(prompts) == num_prompts:
+                self._cache_put(key, scope, prompts, embedding)
             
-            if self.debug:
-                print(f"  ✓ Generated {len(prompts)} different prompts")
-                for i, prompt in enumerate(prompts, 1):
-                    print(f"    Prompt {i}: {prompt[:80]}...")
+            logger.debug("  ✓ Generated %s different prompts", len(prompts))
+            for i, prompt in enumerate(prompts, 1):
+                logger.debug("    Prompt %s: %.80s...", i, prompt)
             
             return prompts if prompts else None
             
         except Exception as e:
-            if self.debug:
-                print(f"  ✗ Error creating multiple image prompts: {e}")
-                import traceback
-                traceback.print_exc()
+            logger.debug("  ✗ Error creating multiple image prompts: %s", e, exc_info=True)
             return None
     
+    def _text_prompt_messages(self, character_summary: str, person_name: Optional[str] = None) -> List[Dict[str, str]]:
+        """Chat messages asking for a single-sentence persona prompt"""
+        user_prompt = f"""Convert the following character summary into a single-sentence persona prompt:
+
+Character Summary:
+{character_summary.strip()}
+
+{f"Person's name: {person_name}" if person_name else ""}
+
+Generate a single sentence that starts with "You're" or "You are" and describes this person's persona based on the summary. It must be exactly one sentence."""
+        
+        return [
+            {
+                "role": "system",
+                "content": TEXT_SYSTEM_PROMPT
+            },
+            {
+                "role": "user",
+                "content": user_prompt
+            }
+        ]
+    
+    @staticmethod
+    def _first_sentence(content: str) -> str:
+        """Keep only the first sentence of a persona prompt, ending it with punctuation"""
+        # Ensure it's a single sentence: cut at the first sentence-ending punctuation
+        # and end it with a full stop
+        prompt = content.strip()
+        prompt = prompt[:_sentence_end(prompt)].strip()
+        return prompt + '.' if prompt else prompt
+    
     def text_prompt(self, character_summary: str, person_name: Optional[str] = None) -> Optional[str]:
         """
         Convert a character summary into a single-sentence persona prompt for LLM
@@ -246,77 +603,367 @@ Generate {num_prompts} distinct prompts, each starting with "Make an image of {p
             Single-sentence persona prompt string, or None on error
         """
         if not character_summary or not character_summary.strip():
-            if self.debug:
-                print("  ✗ Empty character summary provided")
+            logger.debug("  ✗ Empty character summary provided")
             return None
         
-        # Build the prompt for OpenAI
-        system_prompt = """You are a prompt engineer for LLM persona creation. Your task is to convert character summaries into a concise, single-sentence persona prompt that describes who the person is.
-
-The prompt should:
-1. Start with "You're" or "You are"
-2. Be exactly ONE sentence
-3. Capture the person's key characteristics, profession, interests, or personality traits
-4. Be natural and conversational
-5. Be suitable for giving an LLM a persona to adopt
-
-Example format:
-"You're a creative entrepreneur who loves hardware and building innovative technology products."
-"""
-        
-        user_prompt = f"""Convert the following character summary into a single-sentence persona prompt:
-
-Character Summary:
-{character_summary.strip()}
-
-{f"Person's name: {person_name}" if person_name else ""}
-
-Generate a single sentence that starts with "You're" or "You are" and describes this person's persona based on the summary. It must be exactly one sentence."""
+        messages = self._text_prompt_messages(character_summary, person_name)
+        key, scope = self._cache_keys("text_prompt", messages, person_name)
+        cached, embedding = self._cache_lookup(key, scope, character_summary)
+        if cached is not None:
+            return cached
         
         try:
-            if self.debug:
-                print(f"  Creating text persona prompt from character summary...")
+            logger.debug("  Creating text persona prompt from character summary...")
             
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": system_prompt
-                    },
-                    {
-                        "role": "user",
-                        "content": user_prompt
-                    }
-                ],
+            response = self._create(
+                messages,
                 temperature=0.7,
                 max_tokens=100
             )
             
+            prompt = self._first_sentence(response.choices[0].message.content)
+            self._cache_put(key, scope, prompt, embedding)
+            
+            logger.debug("  ✓ Generated text prompt: %s", prompt)
+            
+            return prompt
+            
+        except Exception as e:
+            logger.debug("  ✗ Error creating text prompt: %s", e)
+            return None
+
+    
+    async def acreate_image_prompt(self, character_summary: str, person_name: Optional[str] = None) -> Optional[str]:
+        """
+        Async create_image_prompt
+        
+        Args:
+            character_summary: Text summary describing the person's personality, interests, lifestyle, etc.
+            person_name: Optional name of the person (if provided, will be used in the prompt)
+            
+        Returns:
+            Two-sentence prompt string for image generation, or None on error
+        """
+        if not character_summary or not character_summary.strip():
+            logger.debug("  ✗ Empty character summary provided")
+            return None
+        
+        messages = self._image_prompt_messages(character_summary, person_name)
+        key, scope = self._cache_keys("image_prompt", messages, person_name)
+        cached, embedding = await self._acache_lookup(key, scope, character_summary)
+        if cached is not None:
+            return cached
+        
+        try:
+            response = await self._acreate(messages, temperature=0.7, max_tokens=200)
             prompt = response.choices[0].message.content.strip()
+            self._cache_put(key, scope, prompt, embedding)
+            
+            logger.debug("  ✓ Generated prompt: %.100s...", prompt)
+            
+            return prompt
+            
+        except Exception as e:
+            logger.debug("  ✗ Error creating image prompt: %s", e)
+            return None
+    
+    async def acreate_image_prompt_stream(self, character_summary: str,
+                                          person_name: Optional[str] = None) -> AsyncIterator[str]:
+        """
+        Stream an image prompt as it is generated, so a consumer can start on its prefix
+        (bypasses the prompt cache; use acreate_image_prompt when the full string is needed)
+        
+        Args:
+            character_summary: Text summary describing the person's personality, interests, lifestyle, etc.
+            person_name: Optional name of the person (if provided, will be used in the prompt)
+            
+        Yields:
+            Chunks of the two-sentence prompt
+        """
+        if not character_summary or not character_summary.strip():
+            logger.debug("  ✗ Empty character summary provided")
+            return
+        
+        async for delta in self._astream(self._image_prompt_messages(character_summary, person_name),
+                                         temperature=0.7, max_tokens=200):
+            yield delta
+    
+    async def acreate_multiple_image_prompts(
+        self,
+        character_summary: str,
+        person_name: Optional[str] = None,
+        num_prompts: int = 3,
+        summary_embedding: Optional[np.ndarray] = None
+    ) -> Optional[List[str]]:
+        """
+        Generate several image prompts with concurrent single-prompt requests
+        
+        Each request asks for one prompt focusing on a different aspect, so no parsing of a
+        numbered list is needed and the wall time is that of the slowest request.
+        
+        Args:
+            character_summary: Text summary describing the person's personality, interests, lifestyle, etc.
+            person_name: Optional name of the person (if provided, will be used in the prompt)
+            num_prompts: Number of different prompts to generate (default: 3)
+            summary_embedding: Summary embedding for the semantic cache, if already computed
             
-            # Ensure it's a single sentence - remove any extra sentences
-            # Split by sentence-ending punctuation
-            import re
-            sentences = re.split(r'[.!?]+', prompt)
-            if sentences:
-                # Take the first sentence and add proper ending if needed
-                prompt = sentences[0].strip()
-                if prompt and not prompt[-1] in '.!?':
-                    prompt += '.'
+        Returns:
+            List of different prompt strings, or None on error
+        """
+        if not character_summary or not character_summary.strip():
+            logger.debug("  ✗ Empty character summary provided")
+            return None
+        
+        key, scope = self._cache_keys("image_prompts", self._image_prompt_messages(character_summary, person_name),
+                                      person_name, num_prompts)
+        cached, embedding = await self._acache_lookup(key, scope, character_summary, summary_embedding)
+        if cached is not None:
+            return cached
+        
+        logger.debug("  Creating %s different image prompts from character summary...", num_prompts)
+        
+        # A few extra candidates cover the ones dropped as near-duplicates
+        num_candidates = num_prompts + PROMPT_OVERSAMPLE
+        responses = await asyncio.gather(*(
+            self._acreate(
+                self._image_prompt_messages(
+                    character_summary, person_name,
+                    variation=f"\n\nThis is variation {i} of {num_candidates}: focus on a different aspect, "
+                              f"setting, or mood of their personality than the other variations."
+                ),
+                temperature=0.9,  # Higher temperature for more variety
+                max_tokens=200
+            )
+            for i in range(1, num_candidates + 1)
+        ), return_exceptions=True)
+        
+        prompts = []
+        for response in responses:
+            if isinstance(response, Exception):
+                logger.debug("  ✗ Error creating image prompt: %s", response)
+                continue
+            prompt = (response.choices[0].message.content or "").strip(_PROMPT_STRIP_CHARS)
+            if prompt and prompt not in prompts:
+                prompts.append(prompt)
+        prompts = await self._adedupe_prompts(prompts, num_prompts)
+        
+        if len(prompts) == num_prompts:
+            self._cache_put(key, scope, prompts, embedding)
+        
+        logger.debug("  ✓ Generated %s different prompts", len(prompts))
+        for i, prompt in enumerate(prompts, 1):
+            logger.debug("    Prompt %s: %.80s...", i, prompt)
+        
+        return prompts if prompts else None
+    
+    async def atext_prompt_stream(self, character_summary: str,
+                                  person_name: Optional[str] = None) -> AsyncIterator[str]:
+        """
+        Stream the persona prompt's first sentence as it is generated, closing the
+        completion as soon as the sentence ends
+        
+        Args:
+            character_summary: Text summary describing the person's personality, interests, lifestyle, etc.
+            person_name: Optional name of the person (if provided, will be used in the prompt)
             
-            if self.debug:
-                print(f"  ✓ Generated text prompt: {prompt}")
+        Yields:
+            Chunks of the single-sentence persona prompt
+        """
+        if not character_summary or not character_summary.strip():
+            logger.debug("  ✗ Empty character summary provided")
+            return
+        
+        started = False
+        async for delta in self._astream(self._text_prompt_messages(character_summary, person_name),
+                                         temperature=0.7, max_tokens=100):
+            if not started:
+                delta = delta.lstrip()
+                started = bool(delta)
+            end = _sentence_end(delta)
+            if end < len(delta):
+                yield delta[:end + 1]
+                return
+            if delta:
+                yield delta
+    
+    async def atext_prompt(self, character_summary: str, person_name: Optional[str] = None,
+                           summary_embedding: Optional[np.ndarray] = None) -> Optional[str]:
+        """
+        Async text_prompt
+        
+        Args:
+            character_summary: Text summary describing the person's personality, interests, lifestyle, etc.
+            person_name: Optional name of the person (if provided, will be used in the prompt)
+            summary_embedding: Summary embedding for the semantic cache, if already computed
+            
+        Returns:
+            Single-sentence persona prompt string, or None on error
+        """
+        if not character_summary or not character_summary.strip():
+            logger.debug("  ✗ Empty character summary provided")
+            return None
+        
+        messages = self._text_prompt_messages(character_summary, person_name)
+        key, scope = self._cache_keys("text_prompt", messages, person_name)
+        cached, embedding = await self._acache_lookup(key, scope, character_summary, summary_embedding)
+        if cached is not None:
+            return cached
+        
+        try:
+            response = await self._acreate(messages, temperature=0.7, max_tokens=100)
+            prompt = self._first_sentence(response.choices[0].message.content)
+            self._cache_put(key, scope, prompt, embedding)
+            
+            logger.debug("  ✓ Generated text prompt: %s", prompt)
             
             return prompt
             
         except Exception as e:
-            if self.debug:
-                print(f"  ✗ Error creating text prompt: {e}")
+            logger.debug("  ✗ Error creating text prompt: %s", e)
             return None
 
+    
+    async def abuild_all_prompts(
+        self,
+        character_summary: str,
+        person_name: Optional[str] = None,
+        num_images: int = 3
+    ) -> Tuple[Optional[List[str]], Optional[str]]:
+        """
+        Generate the image prompts and the text persona prompt concurrently
+        
+        Args:
+            character_summary: Text summary describing the person's personality, interests, lifestyle, etc.
+            person_name: Optional name of the person (if provided, will be used in the prompts)
+            num_images: Number of different image prompts to generate (default: 3)
+            
+        Returns:
+            (list of image prompts or None, text persona prompt or None)
+        """
+        # Both prompts look up the same summary in the semantic cache: embed it once for both,
+        # and only if one of them misses the exact cache
+        summary_embedding = None
+        if person_name and character_summary and character_summary.strip():
+            keys = (
+                self._cache_keys("image_prompts", self._image_prompt_messages(character_summary, person_name),
+                                 person_name, num_images)[0],
+                self._cache_keys("text_prompt", self._text_prompt_messages(character_summary, person_name),
+                                 person_name)[0],
+            )
+            if any(self._cache_get(key) is None for key in keys):
+                summary_embedding = await self._aembed_summary(character_summary)
+        
+        image_prompts, text_prompt = await asyncio.gather(
+            self.acreate_multiple_image_prompts(character_summary, person_name, num_images, summary_embedding),
+            self.atext_prompt(character_summary, person_name, summary_embedding)
+        )
+        return image_prompts, text_prompt
+
+    
+    def _batch_request(self, kind: str, character_summary: str, person_name: Optional[str]) -> Dict:
+        """Chat completion body for one Batch API line (same request as text_prompt / create_image_prompt)"""
+        if kind == "text":
+            messages = self._text_prompt_messages(character_summary, person_name)
+            return {"model": self.model, "messages": messages, "temperature": 0.7, "max_tokens": 100}
+        if kind == "image":
+            messages = self._image_prompt_messages(character_summary, person_name)
+            return {"model": self.model, "messages": messages, "temperature": 0.7, "max_tokens": 200}
+        raise ValueError(f"Unknown batch prompt kind: {kind} (expected 'text' or 'image')")
+    
+    def submit_batch(self, summaries: List[Tuple[str, Optional[str]]], kind: str = "text") -> str:
+        """
+        Submit persona (or image) prompt generation for many summaries as one Batch API job
+        
+        For bulk, non-interactive runs: half the cost of live requests and no live rate limits,
+        with results arriving within BATCH_COMPLETION_WINDOW. Collect them with collect_batch.
+        
+        Args:
+            summaries: (character_summary, person_name) pairs; results are keyed "<kind>-<index>"
+            kind: "text" for persona prompts or "image" for image prompts
+            
+        Returns:
+            Batch job ID
+        """
+        lines = [
+            orjson.dumps({
+                "custom_id": f"{kind}-{i}",
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": self._batch_request(kind, character_summary, person_name),
+            })
+            for i, (character_summary, person_name) in enumerate(summaries)
+            if character_summary and character_summary.strip()
+        ]
+        if not lines:
+            raise ValueError("No non-empty character summaries to submit")
+        
+        input_file = self.client.files.create(file=(f"prompts_{kind}.jsonl", b"\n".join(lines)), purpose="batch")
+        batch = self.client.batches.create(
+            input_file_id=input_file.id,
+            endpoint="/v1/chat/completions",
+            completion_window=BATCH_COMPLETION_WINDOW,
+        )
+        
+        logger.debug("✓ Submitted batch %s with %s %s prompt requests", batch.id, len(lines), kind)
+        
+        return batch.id
+    
+    def collect_batch(self, batch_id: str, poll_interval: float = BATCH_POLL_INTERVAL,
+                      timeout: Optional[float] = None) -> Optional[Dict[str, str]]:
+        """
+        Wait for a Batch API job from submit_batch and return its prompts
+        
+        Args:
+            batch_id: ID returned by submit_batch
+            poll_interval: Seconds between status checks
+            timeout: Give up after this many seconds (default: wait for the job to finish)
+            
+        Returns:
+            Dict of custom_id -> prompt (failed items are left out), or None if the job
+            failed, expired, was cancelled or timed out
+        """
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        while True:
+            batch = self.client.batches.retrieve(batch_id)
+            if batch.status == "completed":
+                break
+            if batch.status in ("failed", "expired", "cancelled", "cancelling"):
+                logger.debug("  ✗ Batch %s %s", batch_id, batch.status)
+                return None
+            if deadline is not None and time.monotonic() >= deadline:
+                logger.debug("  ✗ Timed out waiting for batch %s (status: %s)", batch_id, batch.status)
+                return None
+            if logger.isEnabledFor(logging.DEBUG):
+                counts = batch.request_counts
+                progress = f" ({counts.completed}/{counts.total})" if counts else ""
+                logger.debug("  Batch %s %s%s, checking again in %.0fs...", batch_id, batch.status, progress,
+                             poll_interval)
+            time.sleep(poll_interval)
+        
+        results = {}
+        if not batch.output_file_id:
+            return results
+        for line in self.client.files.content(batch.output_file_id).content.splitlines():
+            if not line.strip():
+                continue
+            item = orjson.loads(line)
+            response = item.get("response") or {}
+            if response.get("status_code") != 200:
+                logger.debug("  ⚠ Batch item %s failed: %s", item.get('custom_id'), item.get('error') or response)
+                continue
+            content = response["body"]["choices"][0]["message"]["content"] or ""
+            custom_id = item["custom_id"]
+            results[custom_id] = (self._first_sentence(content) if custom_id.startswith("text-")
+                                  else content.strip(_PROMPT_STRIP_CHARS))
+        
+        logger.debug("✓ Collected %s prompts from batch %s", len(results), batch_id)
+        
+        return results
+
 
 if __name__ == "__main__":
+    load_dotenv(dotenv_path='.env')
+    
     # Example usage
     summarizer = PromptSummarizer(debug=True)
     
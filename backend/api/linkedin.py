@@ -479,6 +479,20 @@ class LinkedInScraper:
             import traceback
             traceback.print_exc()
     
+    def session_expired(self) -> bool:
+        """
+        Check whether LinkedIn has logged the browser out (redirected the last page load to the
+        login wall or a security checkpoint)
+        
+        Returns:
+            True if the browser needs to log in again
+        """
+        try:
+            current_url = self.driver.current_url.lower()
+        except WebDriverException:
+            return True
+        return any(marker in current_url for marker in ('/login', '/authwall', '/checkpoint', '/uas/'))
+    
     def close(self):
         """Close the browser"""
         if self.driver:
@@ -1,30 +1,168 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, BackgroundTasks, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from pydantic import BaseModel
-from typing import Optional, Dict, List
+from typing import Optional, Dict, List, Tuple
 from api.serp import SERPProfileSearcher
 from api.twitter import TwitterScraper
-from api.linkedin import LinkedInScraper
-from api.instagram import InstagramScraper
 from api.image import ImageSearcher
 from api.articles import ArticleSearcher
-from ai.categorise import TextLabeler
-from ai.create_embeddings import EmbeddingStore, load_labeled_json
-from ai.perspective import PerspectiveGenerator
+from ai.categorise import TextLabeler, create_async_openai, close_shared_http_client
 from ai.instagram_analyzer import InstagramImageAnalyzer
 from ai.prompt_summarise import PromptSummarizer
 from ai.generator import ImageGenerator
 from models.profile_state import ProfileState
+from contextlib import asynccontextmanager
+from pathlib import Path
+import asyncio
+import hashlib
 import os
+import posixpath
 import re
 import sys
 import time
 
+# Characters not allowed in per-person data file names
+_SAFE_NAME_RE = re.compile(r'[^a-zA-Z0-9_-]')
+
+# Resolved once at import; DATA_DIR is created at startup
+SCRIPT_DIR = Path(__file__).resolve().parent
+DATA_DIR = SCRIPT_DIR / "data"
+FRONTEND_PUBLIC_DIR = SCRIPT_DIR.parent / "frontend" / "public"
+_INDEX_PATH = str(DATA_DIR / "embeddings.index")
+_METADATA_PATH = str(DATA_DIR / "embeddings_metadata.json")
+
+
+# faiss and selenium are imported on first use (at startup or in the endpoint), which keeps
+# importing main (and every dev reload) fast
+def _create_embedding_store(app: FastAPI):
+    from ai.create_embeddings import EmbeddingStore
+    store = EmbeddingStore(debug=False)
+    store.load_if_changed(_INDEX_PATH, _METADATA_PATH)
+    return store
+
+
+def _create_perspective_generator(app: FastAPI):
+    from ai.perspective import PerspectiveGenerator
+    return PerspectiveGenerator(store=_get_shared(app, "embedding_store"), debug=False)
+
+
+# Services shared by all requests for the lifetime of the app (stored on app.state)
+_SHARED_SERVICES = {
+    "searcher": lambda app: SERPProfileSearcher(debug=True),
+    "openai": lambda app: create_async_openai(),
+    "labeler": lambda app: TextLabeler(debug=False, aclient=_get_shared(app, "openai")),
+    # One summarizer, so its in-flight completion cap applies across all requests
+    "prompt_summarizer": lambda app: PromptSummarizer(debug=True, aclient=_get_shared(app, "openai")),
+    "embedding_store": _create_embedding_store,
+    "perspective": _create_perspective_generator,
+}
+
+
+def _get_shared(app: FastAPI, name: str):
+    """
+    Get an app-lifetime service, creating it on first use if startup could not
+    
+    Args:
+        app: FastAPI application holding the shared services
+        name: Key in _SHARED_SERVICES
+        
+    Returns:
+        The shared service instance
+    """
+    service = getattr(app.state, name, None)
+    if service is None:
+        service = _SHARED_SERVICES[name](app)
+        setattr(app.state, name, service)
+    return service
+
+
+# Selenium drives one browser, so scrape requests take turns on the shared LinkedIn session
+_LINKEDIN_LOCK = asyncio.Lock()
+
+
+async def _get_linkedin_scraper(app: FastAPI):
+    """
+    Get the app's logged-in LinkedIn scraper, launching the browser and logging in on first use
+    (or after the previous session was dropped). Call with _LINKEDIN_LOCK held
+    
+    Args:
+        app: FastAPI application holding the shared scraper
+        
+    Returns:
+        Logged-in LinkedInScraper, or None if login failed
+    """
+    scraper = getattr(app.state, "linkedin", None)
+    if scraper is None:
+        from api.linkedin import LinkedInScraper
+        
+        scraper = await asyncio.to_thread(LinkedInScraper, headless=True, debug=False)
+        try:
+            logged_in = await asyncio.to_thread(scraper.login)
+        except Exception:
+            await asyncio.to_thread(scraper.close)
+            raise
+        if not logged_in:
+            await asyncio.to_thread(scraper.close)
+            return None
+        app.state.linkedin = scraper
+    return scraper
+
+
+async def _drop_linkedin_scraper(app: FastAPI):
+    """Close the app's LinkedIn browser so the next scrape starts a fresh session"""
+    scraper = getattr(app.state, "linkedin", None)
+    app.state.linkedin = None
+    if scraper:
+        try:
+            await asyncio.to_thread(scraper.close)
+        except Exception as e:
+            print(f"[API] Warning: Could not close LinkedIn browser: {e}", file=sys.stderr, flush=True)
+
+
+async def _warm_up_openai(app: FastAPI):
+    """Send a 1-token probe on the shared OpenAI client and report the account's rate limits"""
+    try:
+        limits = await _get_shared(app, "prompt_summarizer").awarmup()
+    except Exception as e:
+        print(f"[API] Warning: OpenAI warmup failed: {e}", file=sys.stderr, flush=True)
+        return
+    if limits:
+        print(f"[API] OpenAI connection warmed up; rate limits: {limits}", file=sys.stderr, flush=True)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Create the data directory and shared services once at startup instead of per request"""
+    DATA_DIR.mkdir(exist_ok=True)
+    
+    for name in _SHARED_SERVICES:
+        try:
+            _get_shared(app, name)
+        except Exception as e:
+            # Missing keys etc. - retried lazily by the endpoint that needs it
+            print(f"[API] Warning: Could not initialize {name}: {e}", file=sys.stderr, flush=True)
+    
+    # Open the OpenAI connection in the background so the first request skips the handshake
+    warmup = asyncio.create_task(_warm_up_openai(app))
+    yield
+    warmup.cancel()
+    
+    await _drop_linkedin_scraper(app)
+    
+    # Close pooled keep-alive connections to OpenAI
+    try:
+        await close_shared_http_client()
+    except Exception as e:
+        print(f"[API] Warning: Could not close OpenAI HTTP client: {e}", file=sys.stderr, flush=True)
+
+
 # Initialize FastAPI app
 app = FastAPI(
     title="Profile Search API",
     description="API for searching LinkedIn, X (Twitter), and Instagram profiles using SERP",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Configure CORS for Next.js frontend
@@ -39,6 +177,10 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress JSON responses for clients sending Accept-Encoding: gzip (search/scrape results
+# with article lists and profile details shrink several-fold); tiny bodies aren't worth it
+app.add_middleware(GZipMiddleware, minimum_size=1000)
+
 
 # Request/Response models
 class SearchRequest(BaseModel):
@@ -117,15 +259,17 @@ async def health():
 
 
 @app.post("/api/search-profiles", response_model=SearchResponse)
-async def search_profiles(request: SearchRequest):
+async def search_profiles(request: SearchRequest, http_request: Request):
     """
     Search for LinkedIn, X (Twitter), Instagram profiles, images, and articles for a given name
     
     Args:
         request: SearchRequest containing name and optional top_n
+        http_request: Incoming request (used to reach app-lifetime services)
         
     Returns:
-        SearchResponse with profile URLs, details, images, and articles
+        SearchResponse with profile URLs, details, images, and articles, tagged with an ETag;
+        304 with no body if it matches the request's If-None-Match
     """
     try:
         if not request.name or not request.name.strip():
@@ -136,7 +280,7 @@ async def search_profiles(request: SearchRequest):
         print(f"[API] Starting search for: {request.name}", file=sys.stderr, flush=True)
         print(f"{'='*60}\n", file=sys.stderr, flush=True)
         
-        searcher = SERPProfileSearcher(debug=True)
+        searcher = _get_shared(http_request.app, "searcher")
         
         # Search for profiles
         results = searcher.search_all_profiles(
@@ -186,9 +330,7 @@ async def search_profiles(request: SearchRequest):
         # Save to centralized state object
         try:
             # Load existing state or create new one
-            script_dir = os.path.dirname(os.path.abspath(__file__))
-            data_dir = os.path.join(script_dir, "data")
-            profile_state = ProfileState.load_from_file(request.name.strip(), data_dir)
+            profile_state = ProfileState.load_from_file(request.name.strip(), DATA_DIR)
             
             if profile_state is None:
                 profile_state = ProfileState(name=request.name.strip())
@@ -203,20 +345,26 @@ async def search_profiles(request: SearchRequest):
             )
             
             # Save state to file
-            state_file = profile_state.save_to_file(data_dir)
+            state_file = profile_state.save_to_file(DATA_DIR)
             print(f"[API] Profile state saved to: {state_file}", file=sys.stderr, flush=True)
         except Exception as e:
             print(f"[API] Warning: Failed to save profile state: {e}", file=sys.stderr, flush=True)
             # Don't fail the request if state saving fails
         
-        return SearchResponse(
+        body = SearchResponse(
             name=results.get("name", request.name),
             linkedin=results.get("linkedin"),
             twitter=results.get("twitter"),
             instagram=results.get("instagram"),
             image=image_result,
             articles=articles if articles else None
-        )
+        ).model_dump_json().encode('utf-8')
+        
+        # Clients holding the same result (If-None-Match) get a bodyless 304
+        etag = f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+        if http_request.headers.get("if-none-match") == etag:
+            return Response(status_code=304, headers={"ETag": etag})
+        return Response(content=body, media_type="application/json", headers={"ETag": etag})
         
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -227,78 +375,104 @@ async def search_profiles(request: SearchRequest):
         )
 
 
-def parse_tweets_file(file_path: str) -> List[str]:
+async def _do_twitter(request: ScrapeRequest, safe_name: str, profile_state: ProfileState,
+                      background_tasks: BackgroundTasks) -> Tuple[Optional[str], int, List[str], List[str]]:
     """
-    Parse tweets from text file (one tweet per line)
+    Scrape tweets for request.user_id; the tweets file is written after the response is sent
     
-    Args:
-        file_path: Path to tweets text file
-        
     Returns:
-        List of tweet texts
+        Tuple of (relative file path or None, tweet count, tweet texts to label, error messages)
     """
-    texts = []
+    errors = []
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            for line in f:
-                text = line.strip()
-                if text and len(text) > 10:  # Filter out very short lines
-                    texts.append(text)
+        twitter_scraper = TwitterScraper(debug=False)
+        tweets = await asyncio.to_thread(twitter_scraper.get_user_posts_by_id, request.user_id, 5)
+        
+        if not tweets:
+            errors.append("No tweets found for the provided user_id")
+            return None, 0, [], errors
+        
+        # Texts as they appear in the tweets file (whitespace collapsed to one line)
+        texts = [text for tweet in tweets if len(text := ' '.join((tweet.get('text') or '').split())) > 10]
+        
+        # Save tweets to file once the response has been sent
+        twitter_filename = f"tweets_{safe_name}_{request.user_id}.txt"
+        twitter_file = str(DATA_DIR / twitter_filename)
+        background_tasks.add_task(twitter_scraper.save_tweets_to_file, tweets, twitter_file, 'text')
+        
+        # Update profile state with scraped tweets
+        profile_state.update_scraped_content(twitter_posts=tweets)
+        
+        # Return relative path from backend directory
+        return f"data/{twitter_filename}", len(tweets), texts, errors
+        
     except Exception as e:
-        print(f"Error parsing tweets file: {e}")
-    return texts
+        errors.append(f"Twitter scraping error: {str(e)}")
+        return None, 0, [], errors
 
 
-
-def parse_linkedin_file(file_path: str) -> List[str]:
+async def _do_linkedin(request: ScrapeRequest, safe_name: str, profile_state: ProfileState,
+                       background_tasks: BackgroundTasks, app: FastAPI) -> Tuple[Optional[str], int, List[str], List[str]]:
     """
-    Parse LinkedIn posts from text file
+    Scrape posts for request.linkedin_url with the app's shared logged-in browser (logging in
+    again if LinkedIn ended the session); the posts file is written after the response is sent
     
-    Args:
-        file_path: Path to LinkedIn posts text file
-        
     Returns:
-        List of post texts
+        Tuple of (relative file path or None, post count, post texts to label, error messages)
     """
-    texts = []
+    errors = []
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-            
-            # Split by post separators
-            posts = content.split('Post ')
-            
-            for post in posts[1:]:  # Skip first part (header)
-                # Extract text between "Text:" and next separator
-                if 'Text:' in post:
-                    text_start = post.find('Text:') + len('Text:')
-                    # Find the next separator line
-                    text_end = post.find('\n' + '=' * 80, text_start)
-                    if text_end == -1:
-                        text_end = len(post)
-                    
-                    text = post[text_start:text_end].strip()
-                    if text and len(text) > 10:
-                        texts.append(text)
+        async with _LINKEDIN_LOCK:
+            for _ in range(2):
+                linkedin_scraper = await _get_linkedin_scraper(app)
+                if linkedin_scraper is None:
+                    errors.append("LinkedIn login failed. Please check credentials.")
+                    return None, 0, [], errors
+                
+                # Scrape posts (20 posts as requested)
+                try:
+                    posts = await asyncio.to_thread(linkedin_scraper.get_user_posts, request.linkedin_url, 20)
+                except Exception:
+                    await _drop_linkedin_scraper(app)
+                    raise
+                if not linkedin_scraper.session_expired():
+                    break
+                await _drop_linkedin_scraper(app)
+        
+        if not posts:
+            errors.append("No LinkedIn posts found")
+            return None, 0, [], errors
+        
+        texts = [text for post in posts if len(text := (post.get('text') or '').strip()) > 10]
+        
+        # Extract username from LinkedIn URL for filename
+        linkedin_username = posixpath.basename(request.linkedin_url.rstrip('/'))
+        linkedin_filename = f"linkedin_posts_{safe_name}_{linkedin_username}.txt"
+        linkedin_file = str(DATA_DIR / linkedin_filename)
+        background_tasks.add_task(linkedin_scraper.save_posts_to_file, posts, linkedin_file, request.linkedin_url)
+        
+        # Update profile state with scraped LinkedIn posts
+        profile_state.update_scraped_content(linkedin_posts=posts)
+        
+        # Return relative path from backend directory
+        return f"data/{linkedin_filename}", len(posts), texts, errors
+        
     except Exception as e:
-        print(f"Error parsing LinkedIn file: {e}")
-    return texts
-
-
-
-
-
-
-
+        errors.append(f"LinkedIn scraping error: {str(e)}")
+        return None, 0, [], errors
 
 
 @app.post("/api/scrape-profiles", response_model=ScrapeResponse)
-async def scrape_profiles(request: ScrapeRequest):
+async def scrape_profiles(request: ScrapeRequest, background_tasks: BackgroundTasks, http_request: Request):
     """
     Scrape tweets and LinkedIn posts for a given profile
     
+    Blocking work (Selenium, Twitter API, OpenAI, file I/O) runs in worker threads
+    via asyncio.to_thread so the event loop keeps serving other requests.
+    
     Args:
         request: ScrapeRequest containing user_id (Twitter), linkedin_url, and name
+        background_tasks: Used to persist labeled texts and embeddings after the response is sent
         
     Returns:
         ScrapeResponse with file paths and counts
@@ -310,12 +484,10 @@ async def scrape_profiles(request: ScrapeRequest):
         )
     
     # Sanitize name for filename
-    safe_name = re.sub(r'[^a-zA-Z0-9_-]', '_', request.name.strip())
+    safe_name = _SAFE_NAME_RE.sub('_', request.name.strip())
     
     # Load existing profile state or create new one
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-    data_dir = os.path.join(script_dir, "data")
-    profile_state = ProfileState.load_from_file(request.name.strip(), data_dir)
+    profile_state = await asyncio.to_thread(ProfileState.load_from_file, request.name.strip(), DATA_DIR)
     
     if profile_state is None:
         profile_state = ProfileState(name=request.name.strip())
@@ -333,111 +505,57 @@ async def scrape_profiles(request: ScrapeRequest):
     }
     
     errors = []
-
     
+    # Post texts for categorization, kept in memory rather than re-read from the saved files
+    all_texts = []
     
-    # Scrape Twitter/X posts if user_id is provided
+    # Scrape Twitter/X and LinkedIn concurrently: wall time is max(twitter, linkedin) rather than the sum
+    branches = []
     if request.user_id:
-        try:
-            twitter_scraper = TwitterScraper(debug=False)
-            tweets = twitter_scraper.get_user_posts_by_id(request.user_id, max_results=5)
-            
-            if tweets:
-                # Create data directory if it doesn't exist
-                script_dir = os.path.dirname(os.path.abspath(__file__))
-                data_dir = os.path.join(script_dir, "data")
-                os.makedirs(data_dir, exist_ok=True)
-                
-                # Save tweets to file
-                twitter_filename = f"tweets_{safe_name}_{request.user_id}.txt"
-                twitter_file = os.path.join(data_dir, twitter_filename)
-                twitter_scraper.save_tweets_to_file(tweets, twitter_file, format='text')
-                # Return relative path from backend directory
-                results["twitter_file"] = f"data/{twitter_filename}"
-                results["twitter_count"] = len(tweets)
-                
-                # Update profile state with scraped tweets
-                profile_state.update_scraped_content(twitter_posts=tweets)
-            else:
-                errors.append("No tweets found for the provided user_id")
-                
-        except Exception as e:
-            errors.append(f"Twitter scraping error: {str(e)}")
-    
-    # Scrape LinkedIn posts if linkedin_url is provided
+        branches.append(("twitter", _do_twitter(request, safe_name, profile_state, background_tasks)))
     if request.linkedin_url:
-        linkedin_scraper = None
-        try:
-            # Initialize LinkedIn scraper (headless=True for server use)
-            linkedin_scraper = LinkedInScraper(headless=False, debug=True)
-            
-            # Login to LinkedIn
-            login_success = linkedin_scraper.login()
-            if not login_success:
-                errors.append("LinkedIn login failed. Please check credentials.")
-            else:
-                # Scrape posts (20 posts as requested)
-                posts = linkedin_scraper.get_user_posts(request.linkedin_url, max_posts=20)
-                
-                if posts:
-                    # Create data directory if it doesn't exist
-                    script_dir = os.path.dirname(os.path.abspath(__file__))
-                    data_dir = os.path.join(script_dir, "data")
-                    os.makedirs(data_dir, exist_ok=True)
-                    
-                    # Extract username from LinkedIn URL for filename
-                    linkedin_username = request.linkedin_url.rstrip('/').split('/')[-1]
-                    linkedin_filename = f"linkedin_posts_{safe_name}_{linkedin_username}.txt"
-                    linkedin_file = os.path.join(data_dir, linkedin_filename)
-                    linkedin_scraper.save_posts_to_file(posts, linkedin_file, request.linkedin_url)
-                    # Return relative path from backend directory
-                    results["linkedin_file"] = f"data/{linkedin_filename}"
-                    results["linkedin_count"] = len(posts)
-                    
-                    # Update profile state with scraped LinkedIn posts
-                    profile_state.update_scraped_content(linkedin_posts=posts)
-                else:
-                    errors.append("No LinkedIn posts found")
-                    
-        except Exception as e:
-            errors.append(f"LinkedIn scraping error: {str(e)}")
-        finally:
-            # Always close the browser
-            if linkedin_scraper:
-                try:
-                    linkedin_scraper.close()
-                except:
-                    pass
+        branches.append(("linkedin", _do_linkedin(request, safe_name, profile_state, background_tasks, http_request.app)))
+    
+    outcomes = await asyncio.gather(*(coro for _, coro in branches), return_exceptions=True)
+    
+    for (platform, _), outcome in zip(branches, outcomes):
+        if isinstance(outcome, BaseException):
+            label = "Twitter" if platform == "twitter" else "LinkedIn"
+            errors.append(f"{label} scraping error: {str(outcome)}")
+            continue
+        
+        scraped_file, scraped_count, scraped_texts, branch_errors = outcome
+        results[f"{platform}_file"] = scraped_file
+        results[f"{platform}_count"] = scraped_count
+        all_texts.extend(scraped_texts)
+        errors.extend(branch_errors)
     
     # Scrape Instagram photos if instagram_url is provided
     if request.instagram_url:
         instagram_scraper = None
         try:
+            from api.instagram import InstagramScraper
+            
             # Initialize Instagram scraper
-            instagram_scraper = InstagramScraper(headless=False, debug=True)
+            instagram_scraper = await asyncio.to_thread(InstagramScraper, headless=False, debug=True)
             
             # Try to login (optional - may work without login for public profiles)
             try:
-                login_success = instagram_scraper.login()
+                login_success = await asyncio.to_thread(instagram_scraper.login)
                 if not login_success:
                     print("[API] Instagram login failed, attempting direct access", file=sys.stderr, flush=True)
             except:
                 print("[API] Instagram login skipped, attempting direct access", file=sys.stderr, flush=True)
             
             # Scrape photos (20 photos as requested)
-            photos = instagram_scraper.get_profile_photos(request.instagram_url, max_photos=20)
+            photos = await asyncio.to_thread(instagram_scraper.get_profile_photos, request.instagram_url, 20)
             
             if photos:
-                # Create data directory if it doesn't exist
-                script_dir = os.path.dirname(os.path.abspath(__file__))
-                data_dir = os.path.join(script_dir, "data")
-                os.makedirs(data_dir, exist_ok=True)
-                
                 # Extract username from Instagram URL for filename
-                instagram_username = request.instagram_url.rstrip('/').split('/')[-1]
+                instagram_username = posixpath.basename(request.instagram_url.rstrip('/'))
                 instagram_filename = f"instagram_photos_{safe_name}_{instagram_username}.txt"
-                instagram_file = os.path.join(data_dir, instagram_filename)
-                instagram_scraper.save_photos_to_file(photos, instagram_file, request.instagram_url)
+                instagram_file = str(DATA_DIR / instagram_filename)
+                await asyncio.to_thread(instagram_scraper.save_photos_to_file, photos, instagram_file, request.instagram_url)
                 # Return relative path from backend directory
                 results["instagram_file"] = f"data/{instagram_filename}"
                 results["instagram_count"] = len(photos)
@@ -452,7 +570,7 @@ async def scrape_profiles(request: ScrapeRequest):
                     
                     # Analyze the photos directly (they're already in the right format from scraper)
                     # The photos list from InstagramScraper has: url, image_url, caption, timestamp, etc.
-                    analysis_result = analyzer.analyze_profile_photos(photos, max_photos=20)
+                    analysis_result = await asyncio.to_thread(analyzer.analyze_profile_photos, photos, 20)
                     
                     # Update profile state with analysis
                     profile_state.update_instagram_analysis(analysis_result)
@@ -477,77 +595,53 @@ async def scrape_profiles(request: ScrapeRequest):
             # Always close the browser
             if instagram_scraper:
                 try:
-                    instagram_scraper.close()
+                    await asyncio.to_thread(instagram_scraper.close)
                 except:
                     pass
     
-    # Save updated profile state with scraped content
-    try:
-        state_file = profile_state.save_to_file(data_dir)
-        print(f"[API] Profile state updated and saved to: {state_file}", file=sys.stderr, flush=True)
-    except Exception as e:
-        print(f"[API] Warning: Failed to save profile state: {e}", file=sys.stderr, flush=True)
-    
-    # Step: Parse scraped files and collect texts for categorization
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-    data_dir = os.path.join(script_dir, "data")
-    all_texts = []
-    
-    # Parse Twitter file if it exists
-    if results.get("twitter_file"):
-        twitter_file_path = os.path.join(script_dir, results["twitter_file"])
-        if os.path.exists(twitter_file_path):
-            twitter_texts = parse_tweets_file(twitter_file_path)
-            all_texts.extend(twitter_texts)
-    
-    # Parse LinkedIn file if it exists
-    if results.get("linkedin_file"):
-        linkedin_file_path = os.path.join(script_dir, results["linkedin_file"])
-        if os.path.exists(linkedin_file_path):
-            linkedin_texts = parse_linkedin_file(linkedin_file_path)
-            all_texts.extend(linkedin_texts)
+    # Save updated profile state with scraped content (skipped if no scraper produced data)
+    if profile_state.dirty:
+        try:
+            state_file = await asyncio.to_thread(profile_state.save_to_file, DATA_DIR)
+            print(f"[API] Profile state updated and saved to: {state_file}", file=sys.stderr, flush=True)
+        except Exception as e:
+            print(f"[API] Warning: Failed to save profile state: {e}", file=sys.stderr, flush=True)
     
     # Categorize and create embeddings if we have texts
     if all_texts:
         try:
-            # Initialize labeler
-            labeler = TextLabeler(debug=False)
-            
-            # Categorize all texts
-            labeled_texts = labeler.label_texts(all_texts)
+            # Shared labeler (reuses its OpenAI clients across requests)
+            labeler = _get_shared(http_request.app, "labeler")
             
-            # Save categorized texts to JSON
-            labeled_json_path = os.path.join(data_dir, f"labeled_{safe_name}.json")
-            labeler.save_labeled_texts(labeled_texts, labeled_json_path, format='json')
+            # Categorize all texts (concurrent LLM calls; endpoint is already async)
+            labeled_texts = await labeler.label_texts_async(all_texts)
             
-            # Create/load embeddings store
-            embedding_store = EmbeddingStore(debug=False)
-            index_path = os.path.join(data_dir, "embeddings.index")
-            metadata_path = os.path.join(data_dir, "embeddings_metadata.json")
+            # Save categorized texts to JSON once the response has been sent
+            labeled_json_path = str(DATA_DIR / f"labeled_{safe_name}.json")
+            background_tasks.add_task(labeler.save_labeled_texts, labeled_texts, labeled_json_path, 'json')
             
-            # Load existing embeddings if they exist
-            if os.path.exists(index_path) and os.path.exists(metadata_path):
-                try:
-                    embedding_store.load(index_path, metadata_path)
-                except Exception as e:
-                    print(f"Could not load existing embeddings, creating new: {e}")
+            # Shared embeddings store
+            embedding_store = _get_shared(http_request.app, "embedding_store")
+            index_path = _INDEX_PATH
+            metadata_path = _METADATA_PATH
             
-            # Prepare texts and metadata for embedding
-            texts_for_embedding = [lt['text'] for lt in labeled_texts]
-            metadata_for_embedding = [
-                {
-                    'summary': lt['summary'],
-                    'category': lt['category'],
-                    'text': lt['text']
-                }
-                for lt in labeled_texts
-            ]
+            # Embed before taking the index lock (network-bound)
+            embeddings, metadata_list = await asyncio.to_thread(embedding_store.embed_labeled, labeled_texts)
             
-            # Add to embedding store
-            embedding_store.add_texts(texts_for_embedding, metadata_for_embedding)
+            def add_and_save():
+                # Another worker may save between our load and save; the file lock keeps the
+                # whole sequence atomic so neither worker's vectors are dropped
+                from ai.create_embeddings import index_file_lock
+                with index_file_lock(index_path):
+                    # Pick up embeddings saved since the store was last synced (e.g. by another worker)
+                    try:
+                        embedding_store.load_if_changed(index_path, metadata_path)
+                    except Exception as e:
+                        print(f"Could not load existing embeddings, keeping in-memory store: {e}")
+                    embedding_store.add_embedded(embeddings, metadata_list)
+                    embedding_store.save(index_path, metadata_path)
             
-            # Save embeddings
-            embedding_store.save(index_path, metadata_path)
+            await asyncio.to_thread(add_and_save)
             
             results["message"] += f" | Categorized {len(labeled_texts)} posts and created embeddings"
             
@@ -567,12 +661,13 @@ async def scrape_profiles(request: ScrapeRequest):
 
 
 @app.post("/api/generate-perspective", response_model=PerspectiveResponse)
-async def generate_perspective(request: PerspectiveRequest):
+async def generate_perspective(request: PerspectiveRequest, http_request: Request):
     """
     Generate a perspective/answer based on a user query using RAG
     
     Args:
         request: PerspectiveRequest containing query and optional top_k
+        http_request: Incoming request (used to reach app-lifetime services)
         
     Returns:
         PerspectiveResponse with perspective, sources, and query
@@ -582,13 +677,14 @@ async def generate_perspective(request: PerspectiveRequest):
             raise HTTPException(status_code=400, detail="Query cannot be empty")
         
         # Get paths to vector store files
-        script_dir = os.path.dirname(os.path.abspath(__file__))
-        data_dir = os.path.join(script_dir, "data")
-        index_path = os.path.join(data_dir, "embeddings.index")
-        metadata_path = os.path.join(data_dir, "embeddings_metadata.json")
+        data_dir = DATA_DIR
+        index_path = _INDEX_PATH
+        metadata_path = _METADATA_PATH
+        
+        from ai.create_embeddings import saved_metadata_path
         
         # Check if vector store exists
-        if not os.path.exists(index_path) or not os.path.exists(metadata_path):
+        if not os.path.exists(index_path) or saved_metadata_path(metadata_path) is None:
             raise HTTPException(
                 status_code=404,
                 detail="Vector store not found. Please scrape and categorize posts first."
@@ -612,11 +708,9 @@ async def generate_perspective(request: PerspectiveRequest):
         except Exception as e:
             print(f"[API] Warning: Could not load text persona prompt from state: {e}", file=sys.stderr, flush=True)
         
-        # Initialize perspective generator
-        generator = PerspectiveGenerator(debug=False)
-        
-        # Load vector store
-        generator.load_vector_store(index_path, metadata_path)
+        # Shared perspective generator; reload its store only if the files changed
+        generator = _get_shared(http_request.app, "perspective")
+        await asyncio.to_thread(generator.store.load_if_changed, index_path, metadata_path)
         
         # Generate perspective with optional persona prompt
         result = generator.search_and_generate_perspective(
@@ -641,12 +735,13 @@ async def generate_perspective(request: PerspectiveRequest):
 
 
 @app.post("/api/generate", response_model=GenerateResponse)
-async def generate_images(request: GenerateRequest):
+async def generate_images(request: GenerateRequest, http_request: Request):
     """
     Generate images based on Instagram summary and saved profile image
     
     Args:
         request: GenerateRequest containing name and optional number_of_images
+        http_request: Incoming request (for the app's shared OpenAI client)
         
     Returns:
         GenerateResponse with generated image filenames
@@ -656,16 +751,14 @@ async def generate_images(request: GenerateRequest):
             raise HTTPException(status_code=400, detail="Name cannot be empty")
         
         # Get paths
-        script_dir = os.path.dirname(os.path.abspath(__file__))
-        data_dir = os.path.join(script_dir, "data")
-        frontend_dir = os.path.dirname(script_dir)  # Go up one level from backend
-        frontend_public_dir = os.path.join(frontend_dir, "frontend", "public")
+        data_dir = DATA_DIR
+        frontend_public_dir = FRONTEND_PUBLIC_DIR
         
-        # Create safe name for file lookup
-        safe_name = re.sub(r'[^a-zA-Z0-9_]', '_', request.name.strip())
+        # Safe name for generated file names (same rule as the scrape endpoint and ProfileState)
+        safe_name = _SAFE_NAME_RE.sub('_', request.name.strip())
         
-        # Load profile state
-        profile_state = ProfileState.load_from_file(safe_name, data_dir)
+        # Load profile state (load_from_file sanitizes the name itself)
+        profile_state = ProfileState.load_from_file(request.name, data_dir)
         if not profile_state:
             raise HTTPException(
                 status_code=404,
@@ -705,15 +798,17 @@ async def generate_images(request: GenerateRequest):
         print(f"[API] Using Instagram summary: {instagram_summary[:100]}...", file=sys.stderr, flush=True)
         print(f"[API] Using base image: {image_path}", file=sys.stderr, flush=True)
         
-        # Step 1: Create text persona prompt and save to state
-        prompt_summarizer = PromptSummarizer(debug=True)
+        # Step 1: Create the text persona prompt and the image prompts concurrently
+        prompt_summarizer = _get_shared(http_request.app, "prompt_summarizer")
+        number_of_images = request.number_of_images or 3
         
-        # Generate text persona prompt for LLM
-        text_persona_prompt = prompt_summarizer.text_prompt(
+        image_prompts, text_persona_prompt = await prompt_summarizer.abuild_all_prompts(
             character_summary=instagram_summary,
-            person_name=person_name
+            person_name=person_name,
+            num_images=number_of_images
         )
         
+        # Save the text persona prompt (for the LLM) to state
         if text_persona_prompt:
             profile_state.update_text_prompt(text_persona_prompt)
             print(f"[API] Generated text persona prompt: {text_persona_prompt}", file=sys.stderr, flush=True)
@@ -722,15 +817,7 @@ async def generate_images(request: GenerateRequest):
         else:
             print(f"[API] Warning: Failed to generate text persona prompt", file=sys.stderr, flush=True)
         
-        # Step 2: Create multiple different image prompts from Instagram summary
-        number_of_images = request.number_of_images or 3
-        
-        image_prompts = prompt_summarizer.create_multiple_image_prompts(
-            character_summary=instagram_summary,
-            person_name=person_name,
-            num_prompts=number_of_images
-        )
-        
+        # Step 2: Check the image prompts from the Instagram summary
         if not image_prompts or len(image_prompts) < number_of_images:
             raise HTTPException(
                 status_code=500,
@@ -743,17 +830,22 @@ async def generate_images(request: GenerateRequest):
         
         # Step 3: Generate images using ImageGenerator - one image per prompt
         image_generator = ImageGenerator(debug=True)
-        generated_filenames = []
-        all_prompts_used = []
         
-        for i, image_prompt in enumerate(image_prompts[:number_of_images], 1):
+        # Per-person invariants shared by every prompt: read the reference image once
+        # and create the output directory once instead of on every iteration
+        with open(image_path, 'rb') as f:
+            subject_reference_bytes = f.read()
+        os.makedirs(frontend_public_dir, exist_ok=True)
+        
+        def _generate_one(i: int, image_prompt: str) -> Optional[str]:
+            """Generate and save one image; returns the saved filename or None"""
             try:
                 print(f"[API] Generating image {i}/{number_of_images} with unique prompt...", file=sys.stderr, flush=True)
                 
                 # Generate one image per prompt for variety
                 generation_result = image_generator.generate_image(
                     prompt=image_prompt,
-                    subject_reference=image_path,
+                    subject_reference=subject_reference_bytes,
                     aspect_ratio="3:4",
                     number_of_images=1,  # Generate one image per prompt
                     prompt_optimizer=True
@@ -761,7 +853,7 @@ async def generate_images(request: GenerateRequest):
                 
                 if not generation_result or not generation_result.get('image_urls'):
                     print(f"[API] Warning: Failed to generate image {i}", file=sys.stderr, flush=True)
-                    continue
+                    return None
                 
                 # Step 4: Download and save generated image to frontend/public
                 image_url = generation_result['image_urls'][0]  # Get the first (and only) image
@@ -782,22 +874,40 @@ async def generate_images(request: GenerateRequest):
                     success = image_generator.save_image(image_url, output_path)
                     
                     if success:
-                        generated_filenames.append(generated_filename)
-                        all_prompts_used.append(image_prompt)
                         print(f"[API] Saved generated image {i}: {generated_filename}", file=sys.stderr, flush=True)
-                    else:
-                        print(f"[API] Warning: Failed to save image {i}", file=sys.stderr, flush=True)
+                        return generated_filename
+                    
+                    print(f"[API] Warning: Failed to save image {i}", file=sys.stderr, flush=True)
+                    return None
                         
                 except Exception as e:
                     print(f"[API] Error saving image {i}: {e}", file=sys.stderr, flush=True)
                     import traceback
                     traceback.print_exc(file=sys.stderr)
+                    return None
                     
             except Exception as e:
                 print(f"[API] Error generating image {i}: {e}", file=sys.stderr, flush=True)
                 import traceback
                 traceback.print_exc(file=sys.stderr)
-                continue
+                return None
+        
+        # Each prompt is independent, so run the blocking generate + download calls concurrently
+        selected_prompts = image_prompts[:number_of_images]
+        try:
+            saved = await asyncio.gather(*(
+                asyncio.to_thread(_generate_one, i, image_prompt)
+                for i, image_prompt in enumerate(selected_prompts, 1)
+            ))
+        finally:
+            image_generator.close()
+        
+        generated_filenames = []
+        all_prompts_used = []
+        for image_prompt, generated_filename in zip(selected_prompts, saved):
+            if generated_filename:
+                generated_filenames.append(generated_filename)
+                all_prompts_used.append(image_prompt)
         
         # All images generated with unique prompts
         
@@ -835,10 +945,20 @@ if __name__ == "__main__":
     # Get port from environment variable or default to 8000
     port = int(os.getenv("PORT", 8000))
     
+    # Auto-reload only in development. Production runs a single worker by default: each worker
+    # process has its own LinkedIn browser session and in-memory caches, and FAISS already uses
+    # every core, so only raise WEB_CONCURRENCY once that state is shared across processes
+    reload_flag = os.getenv("ENV", "dev") == "dev"
+    workers = 1 if reload_flag else int(os.getenv("WEB_CONCURRENCY", 1))
+    
+    # loop/http "auto" pick uvloop and httptools when installed (uvicorn[standard])
     uvicorn.run(
         "main:app",
         host="0.0.0.0",
         port=port,
-        reload=True  # Auto-reload on code changes
+        reload=reload_flag,
+        workers=workers,
+        loop="auto",
+        http="auto"
     )
 
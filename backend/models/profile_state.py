@@ -1,13 +1,17 @@
 """
 Profile State Model - Centralized state object for storing profile search and scraped data
 """
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict, PrivateAttr
 from typing import Optional, Dict, List
 from datetime import datetime
-import json
 import os
+import re
+import orjson
 from pathlib import Path
 
+# Characters not allowed in state file names
+_SAFE_NAME_RE = re.compile(r'[^a-zA-Z0-9_-]')
+
 
 class ProfileState(BaseModel):
     """Centralized state object for a person's profile data"""
@@ -34,10 +38,11 @@ class ProfileState(BaseModel):
     search_completed: bool = False
     scrape_completed: bool = False
     
-    class Config:
-        json_encoders = {
-            datetime: lambda v: v.isoformat()
-        }
+    # Tracks whether the state changed since it was last loaded/saved
+    _dirty: bool = PrivateAttr(default=False)
+    
+    # Ignore unknown keys from older state files
+    model_config = ConfigDict(extra='ignore')
     
     @classmethod
     def load_from_file(cls, name: str, data_dir: str = "data") -> Optional['ProfileState']:
@@ -51,18 +56,14 @@ class ProfileState(BaseModel):
         Returns:
             ProfileState object or None if file doesn't exist
         """
-        import re
-        safe_name = re.sub(r'[^a-zA-Z0-9_-]', '_', name.strip())
+        safe_name = _SAFE_NAME_RE.sub('_', name.strip())
         state_file = os.path.join(data_dir, f"profile_state_{safe_name}.json")
         
         if os.path.exists(state_file):
             try:
-                with open(state_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    # Convert timestamp string back to datetime
-                    if 'timestamp' in data and isinstance(data['timestamp'], str):
-                        data['timestamp'] = datetime.fromisoformat(data['timestamp'])
-                    return cls(**data)
+                # Timestamp string is parsed back into a datetime by pydantic
+                with open(state_file, 'rb') as f:
+                    return cls.model_validate(orjson.loads(f.read()))
             except Exception as e:
                 print(f"Error loading profile state: {e}")
                 return None
@@ -76,18 +77,28 @@ class ProfileState(BaseModel):
             data_dir: Directory where state files should be stored
             
         Returns:
-            Path to saved file
+            Path to saved file (not rewritten if nothing changed)
         """
-        import re
-        os.makedirs(data_dir, exist_ok=True)
-        safe_name = re.sub(r'[^a-zA-Z0-9_-]', '_', self.name.strip())
+        safe_name = _SAFE_NAME_RE.sub('_', self.name.strip())
         state_file = os.path.join(data_dir, f"profile_state_{safe_name}.json")
         
-        with open(state_file, 'w', encoding='utf-8') as f:
-            json.dump(self.dict(), f, indent=2, ensure_ascii=False, default=str)
+        # Skip the serialize + write when nothing was updated since last load/save
+        if not self._dirty and os.path.exists(state_file):
+            return state_file
         
+        os.makedirs(data_dir, exist_ok=True)
+        with open(state_file, 'wb') as f:
+            # mode='json' emits canonical ISO 8601 timestamps, so no per-leaf fallback is needed
+            f.write(orjson.dumps(self.model_dump(mode='json'), option=orjson.OPT_INDENT_2))
+        
+        self._dirty = False
         return state_file
     
+    @property
+    def dirty(self) -> bool:
+        """Whether the state has unsaved updates"""
+        return self._dirty
+    
     def update_search_results(
         self,
         linkedin: Optional[Dict] = None,
@@ -108,6 +119,7 @@ class ProfileState(BaseModel):
         if articles is not None:
             self.articles = articles
         self.search_completed = True
+        self._dirty = True
     
     def update_scraped_content(
         self,
@@ -123,12 +135,15 @@ class ProfileState(BaseModel):
         if instagram_photos is not None:
             self.instagram_photos = instagram_photos
         self.scrape_completed = True
+        self._dirty = True
     
     def update_instagram_analysis(self, analysis: Dict):
         """Update Instagram photo analysis in state"""
         self.instagram_analysis = analysis
+        self._dirty = True
     
     def update_text_prompt(self, text_prompt: str):
         """Update text persona prompt in state"""
         self.text_prompt = text_prompt
+        self._dirty = True
 
@@ -0,0 +1,94 @@
+"""
+Shared HTTP client for the API test scripts
+"""
+import atexit
+import functools
+import os
+import random
+import socket
+import time
+import httpx
+
+API_BASE_URL = os.getenv("API_BASE_URL", "http://localhost:8000")
+
+# Keep-alive pool sized for one xdist worker's requests; failed connection attempts
+# (server still starting, dropped keep-alive sockets) are retried before a test fails
+POOL_LIMITS = httpx.Limits(max_connections=10, max_keepalive_connections=10)
+CONNECT_RETRIES = 3
+
+# Rate-limited / gateway responses are retried with jittered exponential backoff (~0.5s, 1s, 2s),
+# or after the server's Retry-After. Plain 500s are not: the endpoints return them for real
+# failures, and re-running a multi-minute scrape would only repeat it
+RETRY_STATUSES = (429, 502, 503, 504)
+STATUS_RETRIES = 3
+RETRY_BACKOFF = 0.5
+
+
+class _RetryTransport(httpx.HTTPTransport):
+    """HTTP transport that also retries transient error statuses"""
+    
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        for attempt in range(STATUS_RETRIES + 1):
+            response = super().handle_request(request)
+            if response.status_code not in RETRY_STATUSES or attempt == STATUS_RETRIES:
+                return response
+            retry_after = response.headers.get("Retry-After", "")
+            response.close()
+            time.sleep(float(retry_after) if retry_after.isdigit()
+                       else RETRY_BACKOFF * 2 ** attempt + random.uniform(0, RETRY_BACKOFF))
+
+
+def _pinned_base_url():
+    """
+    Resolve API_BASE_URL's host once so new pooled connections (and connect retries) against a
+    remote server don't each repeat the DNS lookup
+
+    Returns:
+        (base_url, headers) - the URL with the host replaced by its address plus the Host header
+        to send; https URLs and failed lookups are returned unchanged (TLS needs the hostname,
+        and a bad host should surface as the client's own connection error)
+    """
+    url = httpx.URL(API_BASE_URL)
+    if url.scheme != "http":
+        return url, {}
+    try:
+        address = socket.getaddrinfo(url.host, url.port or 80, type=socket.SOCK_STREAM)[0][4][0]
+    except OSError:
+        return url, {}
+    return url.copy_with(host=address), {"Host": url.netloc.decode("ascii")}
+
+
+def create_api_client() -> httpx.Client:
+    """Pooled client for the running API server (per-request timeouts override the 10 minute default)"""
+    base_url, headers = _pinned_base_url()
+    return httpx.Client(
+        base_url=base_url,
+        headers=headers,
+        timeout=600,
+        transport=_RetryTransport(http2=True, limits=POOL_LIMITS, retries=CONNECT_RETRIES),
+    )
+
+
+_shared_client = None
+
+
+def get_api_client() -> httpx.Client:
+    """Process-wide pooled client, created on first use and closed at exit, so every test run in
+    one process (the pytest session or a script) reuses the same keep-alive connections"""
+    global _shared_client
+    if _shared_client is None or _shared_client.is_closed:
+        _shared_client = create_api_client()
+        atexit.register(_shared_client.close)
+    return _shared_client
+
+
+@functools.lru_cache(maxsize=1)
+def check_server():
+    """Probe /health once per process; returns why the server can't be used, or None if it's up"""
+    try:
+        get_api_client().get("/health", timeout=httpx.Timeout(5.0, connect=1.0)).raise_for_status()
+    except httpx.TransportError:
+        return f"API server not reachable at {API_BASE_URL} (run: uvicorn main:app --reload)"
+    except httpx.HTTPStatusError as e:
+        return f"API server at {API_BASE_URL} is unhealthy ({e.response.status_code})"
+    return None
@@ -0,0 +1,46 @@
+"""
+pytest fixtures for the API tests
+
+Run the whole sweep concurrently from the backend directory with:
+    pytest tests -n auto
+
+Tests marked `generation` need data produced by the scrape and search tests, so they are left
+out of that sweep; run them afterwards with:
+    pytest tests -m generation
+(or name a generation test file directly, which always runs it)
+"""
+import pytest
+
+from _client import check_server, get_api_client
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "generation: needs data from the scrape/search tests (run with -m generation)")
+
+
+def _named_directly(config, item) -> bool:
+    """True if the item's file (or the item itself) was given on the command line rather than found in a directory"""
+    for arg in config.args:
+        path = (config.invocation_params.dir / arg.split("::")[0]).resolve()
+        if path.is_file() and path == item.path:
+            return True
+    return False
+
+
+def pytest_collection_modifyitems(config, items):
+    """Deselect generation tests picked up by a directory sweep unless a -m expression is given"""
+    if config.getoption("markexpr"):
+        return
+    deselected = [item for item in items if item.get_closest_marker("generation") and not _named_directly(config, item)]
+    if deselected:
+        config.hook.pytest_deselected(items=deselected)
+        items[:] = [item for item in items if item not in deselected]
+
+
+@pytest.fixture(scope="session")
+def api_client():
+    """Session-wide client for the API server; skips the tests if the server isn't running"""
+    problem = check_server()
+    if problem:
+        pytest.skip(problem)
+    return get_api_client()
@@ -3,13 +3,14 @@
 Test script for image generation endpoint
 Tests the /api/generate endpoint
 """
-import requests
-import json
-import sys
+import httpx
+import orjson
+import pytest
 
-API_BASE_URL = "http://localhost:8000"
+from _client import API_BASE_URL, get_api_client
 
-def test_generate_images():
+@pytest.mark.generation
+def test_generate_images(api_client):
     """Test generating images from Instagram summary"""
     print("=" * 60)
     print("Testing Image Generation Endpoint")
@@ -22,7 +23,7 @@ def test_generate_images():
     }
     
     print(f"\nRequest payload:")
-    print(json.dumps(payload, indent=2))
+    print(orjson.dumps(payload, option=orjson.OPT_INDENT_2).decode())
     print("\nNote: This requires:")
     print("  1. Profile state to exist for the person")
     print("  2. Instagram analysis to be completed (scrape Instagram first)")
@@ -30,9 +31,9 @@ def test_generate_images():
     
     try:
         print(f"\nSending POST request to {API_BASE_URL}/api/generate...")
-        response = requests.post(
-            f"{API_BASE_URL}/api/generate",
-            json=payload,
+        response = api_client.post(
+            "/api/generate",
+            content=orjson.dumps(payload),
             headers={"Content-Type": "application/json"},
             timeout=600  # 10 minutes timeout for image generation
         )
@@ -40,10 +41,10 @@ def test_generate_images():
         print(f"\nResponse Status: {response.status_code}")
         
         if response.status_code == 200:
-            result = response.json()
+            result = orjson.loads(response.content)
             print("\n✓ Success!")
             print(f"\nResponse:")
-            print(json.dumps(result, indent=2))
+            print(orjson.dumps(result, option=orjson.OPT_INDENT_2).decode())
             
             if result.get("generated_images"):
                 print(f"\n✓ Generated {len(result['generated_images'])} images:")
@@ -60,15 +61,17 @@ def test_generate_images():
         else:
             print(f"\n✗ Error: {response.status_code}")
             print(f"Response: {response.text}")
+        
+        assert response.status_code == 200, f"{response.status_code}: {response.text}"
             
-    except requests.exceptions.ConnectionError:
+    except httpx.ConnectError:
         print("\n✗ Error: Could not connect to API server")
         print("  Make sure the server is running: uvicorn main:app --reload")
-        sys.exit(1)
+        raise
     except Exception as e:
         print(f"\n✗ Error: {e}")
-        sys.exit(1)
+        raise
 
 if __name__ == "__main__":
-    test_generate_images()
+    test_generate_images(get_api_client())
 
@@ -3,13 +3,14 @@
 Test script for perspective generation endpoint
 Tests the /api/generate-perspective endpoint
 """
-import requests
-import json
-import sys
+import httpx
+import orjson
+import pytest
 
-API_BASE_URL = "http://localhost:8000"
+from _client import API_BASE_URL, get_api_client
 
-def test_generate_perspective():
+@pytest.mark.generation
+def test_generate_perspective(api_client):
     """Test generating a perspective from a query"""
     print("=" * 60)
     print("Testing Perspective Generation Endpoint")
@@ -22,13 +23,13 @@ def test_generate_perspective():
     }
     
     print(f"\nRequest payload:")
-    print(json.dumps(payload, indent=2))
+    print(orjson.dumps(payload, option=orjson.OPT_INDENT_2).decode())
     
     try:
         print(f"\nSending POST request to {API_BASE_URL}/api/generate-perspective...")
-        response = requests.post(
-            f"{API_BASE_URL}/api/generate-perspective",
-            json=payload,
+        response = api_client.post(
+            "/api/generate-perspective",
+            content=orjson.dumps(payload),
             headers={"Content-Type": "application/json"},
             timeout=120  # 2 minutes timeout for LLM generation
         )
@@ -36,7 +37,7 @@ def test_generate_perspective():
         print(f"\nResponse Status: {response.status_code}")
         
         if response.status_code == 200:
-            result = response.json()
+            result = orjson.loads(response.content)
             print("\n✓ Success!")
             print(f"\nQuery: {result.get('query', 'N/A')}")
             print(f"\nPerspective:")
@@ -54,15 +55,17 @@ def test_generate_perspective():
         else:
             print(f"\n✗ Error: {response.status_code}")
             print(f"Response: {response.text}")
+        
+        assert response.status_code == 200, f"{response.status_code}: {response.text}"
             
-    except requests.exceptions.ConnectionError:
+    except httpx.ConnectError:
         print("\n✗ Error: Could not connect to API server")
         print("  Make sure the server is running: uvicorn main:app --reload")
-        sys.exit(1)
+        raise
     except Exception as e:
         print(f"\n✗ Error: {e}")
-        sys.exit(1)
+        raise
 
 if __name__ == "__main__":
-    test_generate_perspective()
+    test_generate_perspective(get_api_client())
 
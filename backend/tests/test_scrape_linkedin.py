@@ -3,13 +3,12 @@
 Test script for LinkedIn scraping endpoint
 Tests the LinkedIn scraping functionality of /api/scrape-profiles
 """
-import requests
-import json
-import sys
+import httpx
+import orjson
 
-API_BASE_URL = "http://localhost:8000"
+from _client import API_BASE_URL, get_api_client
 
-def test_scrape_linkedin():
+def test_scrape_linkedin(api_client):
     """Test scraping LinkedIn posts"""
     print("=" * 60)
     print("Testing LinkedIn Scraping Endpoint")
@@ -22,15 +21,15 @@ def test_scrape_linkedin():
     }
     
     print(f"\nRequest payload:")
-    print(json.dumps(payload, indent=2))
+    print(orjson.dumps(payload, option=orjson.OPT_INDENT_2).decode())
     
     try:
         print(f"\nSending POST request to {API_BASE_URL}/api/scrape-profiles...")
         print("Note: This will open a browser window for LinkedIn login")
         
-        response = requests.post(
-            f"{API_BASE_URL}/api/scrape-profiles",
-            json=payload,
+        response = api_client.post(
+            "/api/scrape-profiles",
+            content=orjson.dumps(payload),
             headers={"Content-Type": "application/json"},
             timeout=600  # 10 minutes timeout for scraping (LinkedIn can be slow)
         )
@@ -38,10 +37,10 @@ def test_scrape_linkedin():
         print(f"\nResponse Status: {response.status_code}")
         
         if response.status_code == 200:
-            result = response.json()
+            result = orjson.loads(response.content)
             print("\n✓ Success!")
             print(f"\nResponse:")
-            print(json.dumps(result, indent=2))
+            print(orjson.dumps(result, option=orjson.OPT_INDENT_2).decode())
             
             if result.get("linkedin_count", 0) > 0:
                 print(f"\n✓ Scraped {result['linkedin_count']} LinkedIn posts")
@@ -51,15 +50,17 @@ def test_scrape_linkedin():
         else:
             print(f"\n✗ Error: {response.status_code}")
             print(f"Response: {response.text}")
+        
+        assert response.status_code == 200, f"{response.status_code}: {response.text}"
             
-    except requests.exceptions.ConnectionError:
+    except httpx.ConnectError:
         print("\n✗ Error: Could not connect to API server")
         print("  Make sure the server is running: uvicorn main:app --reload")
-        sys.exit(1)
+        raise
     except Exception as e:
         print(f"\n✗ Error: {e}")
-        sys.exit(1)
+        raise
 
 if __name__ == "__main__":
-    test_scrape_linkedin()
+    test_scrape_linkedin(get_api_client())
 
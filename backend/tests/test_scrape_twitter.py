@@ -3,13 +3,12 @@
 Test script for Twitter scraping endpoint
 Tests the Twitter/X scraping functionality of /api/scrape-profiles
 """
-import requests
-import json
-import sys
+import httpx
+import orjson
 
-API_BASE_URL = "http://localhost:8000"
+from _client import API_BASE_URL, get_api_client
 
-def test_scrape_twitter():
+def test_scrape_twitter(api_client):
     """Test scraping Twitter posts"""
     print("=" * 60)
     print("Testing Twitter Scraping Endpoint")
@@ -22,13 +21,13 @@ def test_scrape_twitter():
     }
     
     print(f"\nRequest payload:")
-    print(json.dumps(payload, indent=2))
+    print(orjson.dumps(payload, option=orjson.OPT_INDENT_2).decode())
     
     try:
         print(f"\nSending POST request to {API_BASE_URL}/api/scrape-profiles...")
-        response = requests.post(
-            f"{API_BASE_URL}/api/scrape-profiles",
-            json=payload,
+        response = api_client.post(
+            "/api/scrape-profiles",
+            content=orjson.dumps(payload),
             headers={"Content-Type": "application/json"},
             timeout=300  # 5 minutes timeout for scraping
         )
@@ -36,10 +35,10 @@ def test_scrape_twitter():
         print(f"\nResponse Status: {response.status_code}")
         
         if response.status_code == 200:
-            result = response.json()
+            result = orjson.loads(response.content)
             print("\n✓ Success!")
             print(f"\nResponse:")
-            print(json.dumps(result, indent=2))
+            print(orjson.dumps(result, option=orjson.OPT_INDENT_2).decode())
             
             if result.get("twitter_count", 0) > 0:
                 print(f"\n✓ Scraped {result['twitter_count']} tweets")
@@ -49,15 +48,17 @@ def test_scrape_twitter():
         else:
             print(f"\n✗ Error: {response.status_code}")
             print(f"Response: {response.text}")
+        
+        assert response.status_code == 200, f"{response.status_code}: {response.text}"
             
-    except requests.exceptions.ConnectionError:
+    except httpx.ConnectError:
         print("\n✗ Error: Could not connect to API server")
         print("  Make sure the server is running: uvicorn main:app --reload")
-        sys.exit(1)
+        raise
     except Exception as e:
         print(f"\n✗ Error: {e}")
-        sys.exit(1)
+        raise
 
 if __name__ == "__main__":
-    test_scrape_twitter()
+    test_scrape_twitter(get_api_client())
 
@@ -3,13 +3,12 @@
 Test script for LinkedIn search endpoint
 Tests the LinkedIn search functionality of /api/search-profiles
 """
-import requests
-import json
-import sys
+import httpx
+import orjson
 
-API_BASE_URL = "http://localhost:8000"
+from _client import API_BASE_URL, get_api_client
 
-def test_search_linkedin():
+def test_search_linkedin(api_client):
     """Test searching for LinkedIn profiles"""
     print("=" * 60)
     print("Testing LinkedIn Search Endpoint")
@@ -22,13 +21,13 @@ def test_search_linkedin():
     }
     
     print(f"\nRequest payload:")
-    print(json.dumps(payload, indent=2))
+    print(orjson.dumps(payload, option=orjson.OPT_INDENT_2).decode())
     
     try:
         print(f"\nSending POST request to {API_BASE_URL}/api/search-profiles...")
-        response = requests.post(
-            f"{API_BASE_URL}/api/search-profiles",
-            json=payload,
+        response = api_client.post(
+            "/api/search-profiles",
+            content=orjson.dumps(payload),
             headers={"Content-Type": "application/json"},
             timeout=60
         )
@@ -36,10 +35,10 @@ def test_search_linkedin():
         print(f"\nResponse Status: {response.status_code}")
         
         if response.status_code == 200:
-            result = response.json()
+            result = orjson.loads(response.content)
             print("\n✓ Success!")
             print(f"\nResponse:")
-            print(json.dumps(result, indent=2))
+            print(orjson.dumps(result, option=orjson.OPT_INDENT_2).decode())
             
             if result.get("linkedin"):
                 print(f"\n✓ Found LinkedIn profile:")
@@ -50,15 +49,17 @@ def test_search_linkedin():
         else:
             print(f"\n✗ Error: {response.status_code}")
             print(f"Response: {response.text}")
+        
+        assert response.status_code == 200, f"{response.status_code}: {response.text}"
             
-    except requests.exceptions.ConnectionError:
+    except httpx.ConnectError:
         print("\n✗ Error: Could not connect to API server")
         print("  Make sure the server is running: uvicorn main:app --reload")
-        sys.exit(1)
+        raise
     except Exception as e:
         print(f"\n✗ Error: {e}")
-        sys.exit(1)
+        raise
 
 if __name__ == "__main__":
-    test_search_linkedin()
+    test_search_linkedin(get_api_client())
 
@@ -2,18 +2,50 @@
 """
 Test script for Twitter/X search endpoint
 Tests the Twitter/X search functionality of /api/search-profiles
+
+test_search_twitter_matrix searches SEARCH_MATRIX concurrently over the pooled client; extra
+names given on the command line are searched the same way alongside Carl Pei:
+    python tests/test_search_twitter.py "Elon Musk" "Sam Altman"
+
+Run without names, the script reuses a response saved by an earlier run within SEARCH_CACHE_TTL
+(pass --no-cache to refetch, -v to print the full response); the pytest test always hits the server. Older saved responses are
+revalidated: the server tags /api/search-profiles responses with an ETag and answers a matching
+If-None-Match with a bodyless 304, in which case the saved body is reused.
 """
-import requests
-import json
+import hashlib
+import io
 import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+import httpx
+import orjson
+
+from _client import API_BASE_URL, POOL_LIMITS, check_server, get_api_client
+
+# Saved /api/search-profiles responses, keyed by a hash of the request payload
+SEARCH_CACHE_DIR = Path(__file__).parent / ".cache" / "search_profiles"
+SEARCH_CACHE_TTL = 24 * 3600
+
+# A search may take up to a minute, but a server that isn't running should fail within seconds
+SEARCH_TIMEOUT = httpx.Timeout(60.0, connect=2.0)
+
+# Names searched together by test_search_twitter_matrix
+SEARCH_MATRIX = ["Carl Pei", "Elon Musk", "Sam Altman", "Marques Brownlee"]
 
-API_BASE_URL = "http://localhost:8000"
 
-def test_search_twitter():
-    """Test searching for Twitter/X profiles"""
-    print("=" * 60)
-    print("Testing Twitter/X Search Endpoint")
-    print("=" * 60)
+def _search_cache_path(payload) -> Path:
+    return SEARCH_CACHE_DIR / f"{hashlib.sha1(orjson.dumps(payload, option=orjson.OPT_SORT_KEYS)).hexdigest()}.json"
+
+
+def test_search_twitter(api_client, use_cache=False, verbose=False):
+    """Test searching for Twitter/X profiles (use_cache reuses a fresh saved response,
+    verbose adds the banner, payload and whole response to the report)
+
+    The report ends with one JSON line summarising the run (status, twitter_found, elapsed_ms)
+    """
+    # The report is collected and written to stdout in one go when the test ends
+    out = io.StringIO()
     
     # Test data
     payload = {
@@ -21,45 +53,142 @@ def test_search_twitter():
         "top_n": 2
     }
     
-    print(f"\nRequest payload:")
-    print(json.dumps(payload, indent=2))
+    if verbose:
+        print("=" * 60, file=out)
+        print("Testing Twitter/X Search Endpoint", file=out)
+        print("=" * 60, file=out)
+        print(f"\nRequest payload:", file=out)
+        print(orjson.dumps(payload, option=orjson.OPT_INDENT_2).decode(), file=out)
     
+    cache_path = _search_cache_path(payload)
+    body = orjson.dumps(payload)
+    
+    response = result = None
+    start = time.perf_counter()
     try:
-        print(f"\nSending POST request to {API_BASE_URL}/api/search-profiles...")
-        response = requests.post(
-            f"{API_BASE_URL}/api/search-profiles",
-            json=payload,
-            headers={"Content-Type": "application/json"},
-            timeout=60
-        )
+        if use_cache and cache_path.exists() and time.time() - cache_path.stat().st_mtime < SEARCH_CACHE_TTL:
+            print(f"\nUsing cached response from {cache_path}", file=out)
+            response = httpx.Response(200, content=cache_path.read_bytes())
+        else:
+            headers = {"Content-Type": "application/json"}
+            etag_path = cache_path.with_suffix(".etag")
+            if use_cache and cache_path.exists() and etag_path.exists():
+                headers["If-None-Match"] = etag_path.read_text()
+            
+            print(f"\nSending POST request to {API_BASE_URL}/api/search-profiles...", file=out)
+            response = api_client.post(
+                "/api/search-profiles",
+                content=body,
+                headers=headers,
+                timeout=SEARCH_TIMEOUT
+            )
+            if response.status_code == 304:
+                print(f"\nResponse unchanged (304), using cached response from {cache_path}", file=out)
+                cache_path.touch()
+                response = httpx.Response(200, content=cache_path.read_bytes())
+            elif use_cache and response.status_code == 200:
+                cache_path.parent.mkdir(parents=True, exist_ok=True)
+                cache_path.write_bytes(response.content)
+                if response.headers.get("ETag"):
+                    etag_path.write_text(response.headers["ETag"])
         
-        print(f"\nResponse Status: {response.status_code}")
+        print(f"\nResponse Status: {response.status_code}", file=out)
+        if verbose:
+            print(f"Content-Encoding: {response.headers.get('Content-Encoding', 'identity')}", file=out)
         
         if response.status_code == 200:
-            result = response.json()
-            print("\n✓ Success!")
-            print(f"\nResponse:")
-            print(json.dumps(result, indent=2))
+            result = orjson.loads(response.content)
+            print("\n✓ Success!", file=out)
+            if verbose:
+                print(f"\nResponse:", file=out)
+                print(orjson.dumps(result, option=orjson.OPT_INDENT_2).decode(), file=out)
             
             if result.get("twitter"):
-                print(f"\n✓ Found Twitter/X profile:")
-                print(f"  URL: {result['twitter'].get('profile_url', 'N/A')}")
-                print(f"  Username: {result['twitter'].get('username', 'N/A')}")
-                print(f"  User ID: {result['twitter'].get('user_id', 'N/A')}")
+                print(f"\n✓ Found Twitter/X profile:", file=out)
+                print(f"  URL: {result['twitter'].get('profile_url', 'N/A')}", file=out)
+                print(f"  Username: {result['twitter'].get('username', 'N/A')}", file=out)
+                print(f"  User ID: {result['twitter'].get('user_id', 'N/A')}", file=out)
             else:
-                print("\n⚠ No Twitter/X profile found")
+                print("\n⚠ No Twitter/X profile found", file=out)
         else:
-            print(f"\n✗ Error: {response.status_code}")
-            print(f"Response: {response.text}")
+            print(f"\n✗ Error: {response.status_code}", file=out)
+            print(f"Response: {response.text}", file=out)
+        
+        assert response.status_code == 200, f"{response.status_code}: {response.text}"
             
-    except requests.exceptions.ConnectionError:
-        print("\n✗ Error: Could not connect to API server")
-        print("  Make sure the server is running: uvicorn main:app --reload")
-        sys.exit(1)
+    except httpx.ConnectError:
+        print(f"\n✗ Error: Could not connect to API server (after {time.perf_counter() - start:.1f}s)", file=out)
+        print("  Make sure the server is running: uvicorn main:app --reload", file=out)
+        raise
     except Exception as e:
-        print(f"\n✗ Error: {e}")
-        sys.exit(1)
+        print(f"\n✗ Error: {e}", file=out)
+        raise
+    finally:
+        record = {
+            "test": "search_twitter",
+            "payload": payload,
+            "status": response.status_code if response is not None else None,
+            "twitter_found": bool(result and result.get("twitter")),
+            "elapsed_ms": int((time.perf_counter() - start) * 1000),
+        }
+        out.write(orjson.dumps(record).decode() + "\n")
+        sys.stdout.write(out.getvalue())
+
+def search_twitter_many(api_client, names, top_n=2):
+    """Search several names concurrently over the pooled client; returns (name, result dict or
+    exception) pairs"""
+    def probe(body):
+        try:
+            response = api_client.post(
+                "/api/search-profiles",
+                content=body,
+                headers={"Content-Type": "application/json"},
+                timeout=SEARCH_TIMEOUT
+            )
+            response.raise_for_status()
+            return orjson.loads(response.content)
+        except Exception as e:
+            return e
+    
+    # Serialize every payload before the requests start
+    bodies = [orjson.dumps({"name": name, "top_n": top_n}) for name in names]
+    with ThreadPoolExecutor(max_workers=min(len(bodies), POOL_LIMITS.max_connections)) as executor:
+        results = list(executor.map(probe, bodies))
+    return list(zip(names, results))
+
+
+def _report_many(results) -> bool:
+    """Print one line per searched name; returns whether every search succeeded"""
+    lines = []
+    for name, result in results:
+        if isinstance(result, Exception):
+            lines.append(f"  ✗ {name}: " + f"{type(result).__name__}: {result}".splitlines()[0])
+        elif result.get("twitter"):
+            lines.append(f"  ✓ {name}: {result['twitter'].get('profile_url', 'N/A')}")
+        else:
+            lines.append(f"  ⚠ {name}: No Twitter/X profile found")
+    sys.stdout.write("\n".join(lines) + "\n")
+    return not any(isinstance(result, Exception) for _, result in results)
+
+
+def test_search_twitter_matrix(api_client):
+    """Test searching the SEARCH_MATRIX names concurrently"""
+    print(f"Searching {len(SEARCH_MATRIX)} names concurrently at {API_BASE_URL}/api/search-profiles...")
+    results = search_twitter_many(api_client, SEARCH_MATRIX)
+    assert _report_many(results), "some searches failed"
+
 
 if __name__ == "__main__":
-    test_search_twitter()
+    problem = check_server()
+    if problem:
+        print(f"✗ {problem}")
+        sys.exit(1)
+    use_cache = "--no-cache" not in sys.argv[1:]
+    verbose = "-v" in sys.argv[1:]
+    extra_names = [arg for arg in sys.argv[1:] if arg not in ("--no-cache", "-v")]
+    if extra_names:
+        names = ["Carl Pei"] + extra_names
+        print(f"Searching {len(names)} names concurrently at {API_BASE_URL}/api/search-profiles...")
+        sys.exit(0 if _report_many(search_twitter_many(get_api_client(), names)) else 1)
+    test_search_twitter(get_api_client(), use_cache=use_cache, verbose=verbose)
 